@@ -0,0 +1,30 @@
+"""
+WebSocket frame encoding shared by the dashboards
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+KEYFRAME_EVERY = 10  # full frame every N broadcast ticks, deltas in between
+
+
+def encode_frame(data) -> bytes:
+    """Serialize a WebSocket frame to UTF-8 JSON bytes"""
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data).encode('utf-8')
+
+
+# Page-side counterpart of encode_frame, spliced into each dashboard's script
+DECODE_FRAME_JS = """
+    const frameDecoder = new TextDecoder();
+
+    // Frames arrive as binary UTF-8 JSON
+    function decodeFrame(frame) {
+        return JSON.parse(typeof frame === 'string' ? frame : frameDecoder.decode(frame));
+    }
+"""
@@ -5,82 +5,90 @@ Features: Start/Stop, Node Count Control, Visual Links, Message Logs
 
 import asyncio
 from fastapi import FastAPI, WebSocket
-from fastapi.responses import HTMLResponse
-import json
+from fastapi.responses import HTMLResponse, JSONResponse, ORJSONResponse
 import time
-from typing import List
-from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+from gui.frames import DECODE_FRAME_JS, KEYFRAME_EVERY, encode_frame, orjson
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse if orjson else JSONResponse)
 
 nodes_ref = None
 metrics_ref = None
-active_connections: List[WebSocket] = []
-message_log = deque(maxlen=200)
+active_connections: Set[WebSocket] = set()
+busy_connections: Set[WebSocket] = set()  # still sending the previous frame
+send_tasks: Set[asyncio.Task] = set()  # in-flight sends, referenced until done
+stale_connections: Set[WebSocket] = set()  # need a full update (new, or missed a delta)
 simulation_start_time = None
+simulation_start_ns = time.monotonic_ns()  # anchor for integer log timestamps
+
+# Log entries waiting for the next batched send (see flush_messages)
+pending_messages: List[dict] = []
+MESSAGE_FLUSH_INTERVAL = 0.1
+# Log entries held for clients that were busy at flush time, newest kept
+deferred_messages: Dict[WebSocket, List[dict]] = {}
+MAX_DEFERRED_MESSAGES = 500
+
+# Column snapshot of the node list: ids and MQTT clients don't change during
+# a run, so broadcasts read these instead of calling get_state() per node.
+# node_identity is the id() of each indexed node, to notice replaced nodes
+node_ids: List[str] = []
+node_clients: List = []
+node_identity: Tuple[int, ...] = ()
+
+# Display labels for node protocols, upper-cased once per distinct value
+protocol_labels = {'ble': 'BLE', 'wifi': 'WIFI'}
+
+def protocol_label(protocol: str) -> str:
+    label = protocol_labels.get(protocol)
+    if label is None:
+        label = protocol_labels[protocol] = protocol.upper()
+    return label
+
+def index_nodes(nodes):
+    """Rebuild the per-node column snapshot and hook each client's publishes"""
+    global node_ids, node_clients, node_identity
+    node_identity = tuple(map(id, nodes))
+    node_ids = [n.node_id for n in nodes]
+    node_clients = [getattr(n, 'mqtt_client', None) for n in nodes]
+    
+    for node_id, client in zip(node_ids, node_clients):
+        if client:
+            client.on_publish_callback = make_publish_logger(node_id)
+
+def make_publish_logger(node_id: str):
+    """Build a publish callback that logs the message for the dashboard"""
+    def on_publish(topic, payload, qos):
+        if isinstance(payload, bytes):
+            payload = payload.decode('utf-8', 'replace')
+        log_message('PUBLISH', node_id, topic, payload)
+    return on_publish
 
 async def start_dashboard(nodes, metrics, failover_manager, port: int):
-    global nodes_ref, metrics_ref, simulation_start_time
+    global nodes_ref, metrics_ref, simulation_start_time, simulation_start_ns
     nodes_ref = nodes
     metrics_ref = metrics
     simulation_start_time = time.time()
+    simulation_start_ns = time.monotonic_ns()
+    index_nodes(nodes)
     
     # Start background tasks
     asyncio.create_task(broadcast_updates())
-    asyncio.create_task(monitor_mqtt_messages())
+    asyncio.create_task(flush_messages())
     
     import uvicorn
     config = uvicorn.Config(app, host="0.0.0.0", port=port, log_level="warning")
     server = uvicorn.Server(config)
     await server.serve()
 
-async def monitor_mqtt_messages():
-    """Monitor MQTT messages from nodes"""
-    last_stats = {}
-    
-    while True:
-        await asyncio.sleep(0.2)
-        
-        if not nodes_ref:
-            continue
-        
-        for node in nodes_ref:
-            if not hasattr(node, 'mqtt_client') or not node.mqtt_client:
-                continue
-            
-            stats = node.mqtt_client.stats
-            node_id = node.node_id
-            
-            # Check for new messages
-            if node_id not in last_stats:
-                last_stats[node_id] = {
-                    'messages_sent': 0,
-                    'qos0_messages': 0,
-                    'qos1_messages': 0
-                }
-            
-            # Detect new publishes
-            if stats['messages_sent'] > last_stats[node_id]['messages_sent']:
-                # Generate a sample topic based on node type
-                if 'temp' in node_id or 'sensor' in node_id:
-                    topic = f"sensors/{node_id}/temperature"
-                    payload = f"temp={20 + (hash(node_id) % 15)}°C"
-                else:
-                    topic = f"nodes/{node_id}/data"
-                    payload = f"value={hash(node_id + str(time.time())) % 100}"
-                
-                log_message('PUBLISH', node_id, topic, payload)
-            
-            last_stats[node_id] = stats.copy()
-
 @app.get("/", response_class=HTMLResponse)
 async def get_dashboard():
-    return HTMLResponse(content=HTML_CONTENT)
+    return HTMLResponse(content=HTML_BYTES)
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
-    active_connections.append(websocket)
+    active_connections.add(websocket)
+    stale_connections.add(websocket)
     
     # Send initial data
     initial_nodes = []
@@ -89,17 +97,18 @@ async def websocket_endpoint(websocket: WebSocket):
             try:
                 initial_nodes.append({
                     'id': n.node_id,
-                    'protocol': n.protocol.upper(),
+                    'protocol': protocol_label(n.protocol),
                     'connected': n.mqtt_client.connected if hasattr(n, 'mqtt_client') and n.mqtt_client else False
                 })
             except Exception as e:
                 print(f"Error getting node data: {e}")
     
-    await websocket.send_json({
+    await websocket.send_bytes(encode_frame({
         'type': 'init',
         'nodes': initial_nodes,
-        'broker': {'id': 'broker', 'x': 0, 'y': 0}
-    })
+        'broker': {'id': 'broker', 'x': 0, 'y': 0},
+        'uptime_ms': (time.monotonic_ns() - simulation_start_ns) // 1_000_000
+    }))
     
     print(f"WebSocket connected. Sent {len(initial_nodes)} nodes")
     
@@ -109,44 +118,38 @@ async def websocket_endpoint(websocket: WebSocket):
     except Exception as e:
         print(f"WebSocket error: {e}")
     finally:
-        if websocket in active_connections:
-            active_connections.remove(websocket)
+        active_connections.discard(websocket)
+        stale_connections.discard(websocket)
+        deferred_messages.pop(websocket, None)
 
 async def broadcast_updates():
+    last_node_states = []
+    last_stats = {}
+    tick = 0
+    
     while True:
         await asyncio.sleep(0.5)
+        tick += 1
         if not active_connections or not nodes_ref:
             continue
         
-        # Get node states
-        node_states = []
-        total_subs = 0
+        if tuple(map(id, nodes_ref)) != node_identity:
+            index_nodes(nodes_ref)
         
-        for n in nodes_ref:
-            try:
-                state = n.get_state()
-                node_states.append({
-                    'id': state['node_id'],
-                    'protocol': state['protocol'].upper(),
-                    'connected': state['connected']
-                })
-                
-                # Count subscriptions
-                if hasattr(n, 'mqtt_client') and n.mqtt_client:
-                    total_subs += len(n.mqtt_client.subscriptions)
-            except Exception as e:
-                # Fallback if get_state fails
-                node_states.append({
-                    'id': n.node_id,
-                    'protocol': n.protocol.upper() if hasattr(n, 'protocol') else 'UNKNOWN',
-                    'connected': n.mqtt_client.connected if hasattr(n, 'mqtt_client') and n.mqtt_client else False
-                })
+        # Get node states column by column
+        connected = [bool(c and c.connected) for c in node_clients]
+        protocols = [protocol_label(n.protocol) for n in nodes_ref]  # nodes may switch protocol
+        total_subs = sum(len(c.subscriptions) for c in node_clients if c)
+        node_states = [
+            {'id': node_id, 'protocol': protocol, 'connected': is_connected}
+            for node_id, protocol, is_connected in zip(node_ids, protocols, connected)
+        ]
         
         # Get metrics
         stats_data = {
             'total_messages': 0,
             'total_subscriptions': total_subs,
-            'active_nodes': sum(1 for n in node_states if n['connected'])
+            'active_nodes': sum(connected)
         }
         
         if metrics_ref:
@@ -156,42 +159,119 @@ async def broadcast_updates():
             except:
                 pass
         
-        data = {
+        full = {
             'type': 'update',
             'nodes': node_states,
             'stats': stats_data
         }
         
-        for conn in active_connections[:]:
-            try:
-                await conn.send_json(data)
-            except Exception as e:
-                if conn in active_connections:
-                    active_connections.remove(conn)
+        # Between keyframes only the fields and nodes that changed are sent,
+        # and nothing at all when nothing changed
+        if tick % KEYFRAME_EVERY == 0 or len(node_states) != len(last_node_states):
+            delta = full
+        else:
+            stats_delta = {k: v for k, v in stats_data.items() if last_stats.get(k) != v}
+            nodes_delta = [state for state, last in zip(node_states, last_node_states) if state != last]
+            delta = None
+            if stats_delta or nodes_delta:
+                delta = {'type': 'update', 'stats_delta': stats_delta, 'nodes_delta': nodes_delta}
+        last_node_states = node_states
+        last_stats = stats_data
+        
+        send_update(delta, full)
+
+def send_update(delta: Optional[dict], full: dict):
+    """Send a state update, skipping clients that haven't drained the last one.
+    
+    Clients that are new or skipped a delta get the full state instead; with
+    no delta, only they are sent anything. Each frame is serialized at most
+    once and shared by all clients receiving it.
+    """
+    if delta is None and not stale_connections:
+        return
+    
+    frames = {}
+    for conn in tuple(active_connections):
+        if conn in busy_connections:
+            if delta is not None:
+                stale_connections.add(conn)
+            continue
+        
+        if conn in stale_connections:
+            data = full
+        elif delta is None:
+            continue
+        else:
+            data = delta
+        stale_connections.discard(conn)
+        frame = frames.get(id(data))
+        if frame is None:
+            frame = frames[id(data)] = encode_frame(data)
+        
+        start_send(conn, frame)
+
+def start_send(conn: WebSocket, frame: bytes):
+    """Send a frame in the background, marking the client busy until it's done"""
+    busy_connections.add(conn)
+    task = asyncio.create_task(send_then_clear(conn, frame))
+    send_tasks.add(task)
+    task.add_done_callback(send_tasks.discard)
+
+async def send_then_clear(conn: WebSocket, frame: bytes):
+    try:
+        await conn.send_bytes(frame)
+    except Exception:
+        active_connections.discard(conn)
+        deferred_messages.pop(conn, None)
+    finally:
+        busy_connections.discard(conn)
 
 def log_message(msg_type: str, from_node: str, topic: str = "", payload: str = ""):
     """Log MQTT messages for display"""
-    message_log.append({
-        'type': 'message',
+    if not active_connections:
+        return
+    
+    # Queued and sent to clients in batches by flush_messages
+    pending_messages.append({
         'msg_type': msg_type,
         'from': from_node,
         'topic': topic,
         'payload': payload,
-        'timestamp': time.time()
+        'ts': (time.monotonic_ns() - simulation_start_ns) // 1_000_000  # ms since start
     })
+
+async def flush_messages():
+    """Send queued log entries as one frame per client every flush interval
     
-    # Broadcast to all connections
-    for conn in active_connections[:]:
-        try:
-            asyncio.create_task(conn.send_json({
-                'type': 'message',
-                'msg_type': msg_type,
-                'from': from_node,
-                'topic': topic,
-                'payload': payload
-            }))
-        except:
-            pass
+    A client still sending a previous frame has its entries held and sent
+    with its next batch, so two sends never overlap on one socket.
+    """
+    while True:
+        await asyncio.sleep(MESSAGE_FLUSH_INTERVAL)
+        if not pending_messages and not deferred_messages:
+            continue
+        
+        items = pending_messages.copy()
+        pending_messages.clear()
+        shared_frame = None
+        for conn in tuple(active_connections):
+            if conn in busy_connections:
+                if items:
+                    held = deferred_messages.setdefault(conn, [])
+                    held.extend(items)
+                    del held[:-MAX_DEFERRED_MESSAGES]
+                continue
+            
+            held = deferred_messages.pop(conn, None)
+            if held:
+                frame = encode_frame({'type': 'message_batch', 'items': held + items})
+            elif items:
+                if shared_frame is None:
+                    shared_frame = encode_frame({'type': 'message_batch', 'items': items})
+                frame = shared_frame
+            else:
+                continue
+            start_send(conn, frame)
 
 HTML_CONTENT = """
 <!DOCTYPE html>
@@ -548,6 +628,8 @@ HTML_CONTENT = """
     let startTime = Date.now();
     let isRunning = false;
     let animationFrame = null;
+""" + DECODE_FRAME_JS + """
+    let serverStartMs = Date.now();
     
     // Set canvas size
     function resizeCanvas() {
@@ -604,10 +686,12 @@ HTML_CONTENT = """
         messages = [];
         document.getElementById('message-log').innerHTML = '';
         document.getElementById('node-list').innerHTML = '';
+        nodeRows.clear();
     }
     
     function connectWebSocket() {
         ws = new WebSocket('ws://localhost:8000/ws');
+        ws.binaryType = 'arraybuffer';
         
         ws.onopen = () => {
             console.log('Connected to simulation');
@@ -625,28 +709,47 @@ HTML_CONTENT = """
     }
     
     function handleMessage(event) {
-        const data = JSON.parse(event.data);
+        const data = decodeFrame(event.data);
         
         if (data.type === 'init') {
             nodes = data.nodes;
             broker = data.broker;
+            // Wall-clock time of the server's start, for relative log timestamps
+            serverStartMs = Date.now() - (data.uptime_ms || 0);
         } else if (data.type === 'update') {
-            nodes = data.nodes;
-            stats = data.stats;
+            // Full updates carry nodes/stats; deltas only what changed
+            if (data.nodes) nodes = data.nodes;
+            if (data.stats) stats = data.stats;
+            if (data.nodes_delta && data.nodes_delta.length) {
+                const indexById = new Map(nodes.map((n, i) => [n.id, i]));
+                for (const changed of data.nodes_delta) {
+                    const i = indexById.get(changed.id);
+                    if (i !== undefined) nodes[i] = changed;
+                }
+            }
+            if (data.stats_delta) Object.assign(stats, data.stats_delta);
             updateStats();
             updateNodeList();
+        } else if (data.type === 'message_batch') {
+            for (const item of data.items) {
+                handleLogMessage(item);
+            }
         } else if (data.type === 'message') {
-            addMessageLog(data);
-            // Add visual message pulse
-            messages.push({
-                from: data.from,
-                to: 'broker',
-                progress: 0,
-                type: data.msg_type
-            });
+            handleLogMessage(data);
         }
     }
     
+    function handleLogMessage(data) {
+        addMessageLog(data);
+        // Add visual message pulse
+        messages.push({
+            from: data.from,
+            to: 'broker',
+            progress: 0,
+            type: data.msg_type
+        });
+    }
+    
     function updateStats() {
         document.getElementById('msg-count').textContent = stats.total_messages || 0;
         document.getElementById('active-nodes').textContent = nodes.filter(n => n.connected).length;
@@ -656,23 +759,55 @@ HTML_CONTENT = """
         document.getElementById('uptime').textContent = uptime + 's';
     }
     
+    // Node list rows by node id; rows are created once and only the parts
+    // that changed are touched on later updates
+    const nodeRows = new Map();
+    
+    function createNodeRow(node) {
+        const item = document.createElement('div');
+        const label = document.createElement('span');
+        const name = document.createElement('strong');
+        name.textContent = node.id;
+        const protocol = document.createTextNode('');
+        label.append(name, protocol);
+        const status = document.createElement('span');
+        item.append(label, status);
+        return { item, protocolText: protocol, status, protocol: null, connected: null };
+    }
+    
     function updateNodeList() {
         const list = document.getElementById('node-list');
-        list.innerHTML = '';
+        const seen = new Set();
         
-        nodes.forEach(node => {
-            const item = document.createElement('div');
-            item.className = `node-item node-${node.protocol.toLowerCase()}`;
-            
-            const statusClass = node.connected ? 'node-connected' : 'node-disconnected';
-            const statusText = node.connected ? 'Connected' : 'Disconnected';
+        nodes.forEach((node, i) => {
+            let row = nodeRows.get(node.id);
+            if (!row) {
+                row = createNodeRow(node);
+                nodeRows.set(node.id, row);
+            }
+            seen.add(node.id);
             
-            item.innerHTML = `
-                <span><strong>${node.id}</strong> (${node.protocol})</span>
-                <span class="node-status ${statusClass}">${statusText}</span>
-            `;
-            list.appendChild(item);
+            if (row.protocol !== node.protocol) {
+                row.protocol = node.protocol;
+                row.item.className = `node-item node-${node.protocol.toLowerCase()}`;
+                row.protocolText.textContent = ` (${node.protocol})`;
+            }
+            if (row.connected !== node.connected) {
+                row.connected = node.connected;
+                row.status.className = `node-status ${node.connected ? 'node-connected' : 'node-disconnected'}`;
+                row.status.textContent = node.connected ? 'Connected' : 'Disconnected';
+            }
+            if (list.children[i] !== row.item) {
+                list.insertBefore(row.item, list.children[i] || null);
+            }
         });
+        
+        for (const [id, row] of nodeRows) {
+            if (!seen.has(id)) {
+                row.item.remove();
+                nodeRows.delete(id);
+            }
+        }
     }
     
     function addMessageLog(data) {
@@ -680,7 +815,7 @@ HTML_CONTENT = """
         const entry = document.createElement('div');
         entry.className = 'log-entry';
         
-        const time = new Date().toLocaleTimeString();
+        const time = new Date(data.ts !== undefined ? serverStartMs + data.ts : Date.now()).toLocaleTimeString();
         let msgClass = 'log-publish';
         let msgText = '';
         let dataText = '';
@@ -712,6 +847,30 @@ HTML_CONTENT = """
         }
     }
     
+    // Node ring positions, recomputed only when the node list or canvas size changes
+    let layout = null;
+    
+    function getLayout(centerX, centerY, radius) {
+        if (layout && layout.nodes === nodes && layout.width === canvas.width && layout.height === canvas.height) {
+            return layout;
+        }
+        layout = {
+            nodes: nodes,
+            width: canvas.width,
+            height: canvas.height,
+            xs: new Array(nodes.length),
+            ys: new Array(nodes.length),
+            indexById: new Map()
+        };
+        nodes.forEach((node, i) => {
+            const angle = (i / nodes.length) * Math.PI * 2 - Math.PI / 2;
+            layout.xs[i] = centerX + Math.cos(angle) * radius;
+            layout.ys[i] = centerY + Math.sin(angle) * radius;
+            layout.indexById.set(node.id, i);
+        });
+        return layout;
+    }
+    
     function draw() {
         ctx.clearRect(0, 0, canvas.width, canvas.height);
         
@@ -723,12 +882,12 @@ HTML_CONTENT = """
         const centerX = canvas.width / 2;
         const centerY = canvas.height / 2;
         const radius = Math.min(canvas.width, canvas.height) * 0.35;
+        const { xs, ys, indexById } = getLayout(centerX, centerY, radius);
         
         // Draw connection lines first (behind nodes)
         nodes.forEach((node, i) => {
-            const angle = (i / nodes.length) * Math.PI * 2 - Math.PI / 2;
-            const x = centerX + Math.cos(angle) * radius;
-            const y = centerY + Math.sin(angle) * radius;
+            const x = xs[i];
+            const y = ys[i];
             
             // Draw connection line to broker
             if (node.connected) {
@@ -764,9 +923,8 @@ HTML_CONTENT = """
         
         // Draw nodes as circles
         nodes.forEach((node, i) => {
-            const angle = (i / nodes.length) * Math.PI * 2 - Math.PI / 2;
-            const x = centerX + Math.cos(angle) * radius;
-            const y = centerY + Math.sin(angle) * radius;
+            const x = xs[i];
+            const y = ys[i];
             
             // Draw node circle
             ctx.fillStyle = node.protocol === 'BLE' ? '#2563eb' : '#16a34a';
@@ -797,13 +955,11 @@ HTML_CONTENT = """
             msg.progress += 0.018;
             if (msg.progress > 1) return false;
             
-            const fromNode = nodes.find(n => n.id === msg.from);
-            if (!fromNode) return false;
+            const fromIdx = indexById.get(msg.from);
+            if (fromIdx === undefined) return false;
             
-            const fromIdx = nodes.indexOf(fromNode);
-            const angle = (fromIdx / nodes.length) * Math.PI * 2 - Math.PI / 2;
-            const fromX = centerX + Math.cos(angle) * radius;
-            const fromY = centerY + Math.sin(angle) * radius;
+            const fromX = xs[fromIdx];
+            const fromY = ys[fromIdx];
             
             const x = fromX + (centerX - fromX) * msg.progress;
             const y = fromY + (centerY - fromY) * msg.progress;
@@ -828,3 +984,6 @@ HTML_CONTENT = """
 </body>
 </html>
 """
+
+# Encoded once; responses serve the bytes as-is
+HTML_BYTES = HTML_CONTENT.encode('utf-8')
@@ -3,27 +3,44 @@ Simple, clear dashboard matching the topology diagram
 """
 
 import asyncio
-from fastapi import FastAPI, WebSocket
-from fastapi.responses import HTMLResponse
-import json
+import gzip
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, Response
 import time
-from typing import List
+from typing import Set
 from collections import deque
+from itertools import islice
+from gui.frames import DECODE_FRAME_JS, KEYFRAME_EVERY, encode_frame
 
 app = FastAPI()
 
 nodes_ref = None
 metrics_ref = None
 failover_ref = None
-active_connections: List[WebSocket] = []
+active_connections: Set[WebSocket] = set()
+stale_connections: Set[WebSocket] = set()  # need a full frame on the next tick
+busy_connections: Set[WebSocket] = set()  # still sending an earlier frame
+send_tasks: Set[asyncio.Task] = set()  # in-flight sends, referenced until done
 log_buffer = deque(maxlen=100)
+recent_logs = deque(maxlen=20)  # tail sent with each update
+log_count = 0  # entries ever logged, to find the ones new since the last tick
+tick_time = 0.0  # wall time of the current broadcast tick, stamped on log entries
+MAX_FRAME_BYTES = 64 * 1024  # per-write cap; the oldest log entries are trimmed to fit
+
+# Last encoded state frame, shared by websocket clients and /api/state
+latest_frame = b''
+latest_frame_time = 0.0
 
 def add_log(log_type: str, message: str):
-    log_buffer.append({
-        'timestamp': time.time(),
+    entry = {
+        'timestamp': tick_time or time.time(),
         'type': log_type,
         'message': message
-    })
+    }
+    global log_count
+    log_buffer.append(entry)
+    recent_logs.append(entry)
+    log_count += 1
 
 async def start_dashboard(nodes, metrics, failover_manager, port: int):
     global nodes_ref, metrics_ref, failover_ref
@@ -34,13 +51,19 @@ async def start_dashboard(nodes, metrics, failover_manager, port: int):
     asyncio.create_task(broadcast_updates())
     
     import uvicorn
-    config = uvicorn.Config(app, host="0.0.0.0", port=port, log_level="info")
+    # http="auto" already prefers httptools when installed; uvloop is set up
+    # in main.py, since this coroutine runs on an existing loop
+    config = uvicorn.Config(app, host="0.0.0.0", port=port, log_level="warning",
+                            access_log=False, ws_ping_interval=20, ws_ping_timeout=20,
+                            ws_per_message_deflate=True)
     server = uvicorn.Server(config)
     await server.serve()
 
 @app.get("/", response_class=HTMLResponse)
-async def get_dashboard():
-    return HTMLResponse(content=get_html())
+async def get_dashboard(request: Request):
+    if 'gzip' in request.headers.get('accept-encoding', ''):
+        return HTMLResponse(content=HTML_GZIP, headers=HTML_GZIP_HEADERS)
+    return HTMLResponse(content=HTML_BYTES, headers=HTML_HEADERS)
 
 @app.post("/api/failover")
 async def trigger_failover():
@@ -49,34 +72,131 @@ async def trigger_failover():
         return {"status": "ok"}
     return {"status": "error"}
 
+@app.get("/api/state")
+async def get_current_state():
+    # Reuse the broadcast frame; only encode here when no client keeps it fresh
+    if time.time() - latest_frame_time >= 1.0:
+        refresh_frame()
+    return Response(content=latest_frame, media_type='application/json')
+
 @app.websocket("/ws/live")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
-    active_connections.append(websocket)
+    active_connections.add(websocket)
+    stale_connections.add(websocket)
     try:
         while True:
             await websocket.receive_text()
-    except:
-        active_connections.remove(websocket)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        active_connections.discard(websocket)
+        stale_connections.discard(websocket)
+        busy_connections.discard(websocket)
+
+def node_state(node) -> dict:
+    state = node.get_state()
+    # get_state() shares the node's live stats dict; copy it so consecutive
+    # snapshots can be compared for deltas
+    state['stats'] = dict(state['stats'])
+    return state
+
+def snapshot() -> dict:
+    """Collect the current simulation state"""
+    return {
+        'nodes': [node_state(n) for n in nodes_ref] if nodes_ref else [],
+        'metrics': metrics_ref.get_summary() if metrics_ref else {},
+        'logs': list(recent_logs),
+        'timestamp': time.time()
+    }
+
+def encode_capped(data: dict, logs_key: str) -> bytes:
+    """Encode a frame, trimming its oldest log entries while it's over MAX_FRAME_BYTES"""
+    frame = encode_frame(data)
+    while len(frame) > MAX_FRAME_BYTES and len(data[logs_key]) > 1:
+        data[logs_key] = data[logs_key][1:]
+        frame = encode_frame(data)
+    return frame
+
+def refresh_frame() -> dict:
+    """Snapshot and encode the state once for every consumer"""
+    global latest_frame, latest_frame_time
+    data = snapshot()
+    latest_frame = encode_capped(data, 'logs')
+    latest_frame_time = data['timestamp']
+    return data
 
 async def broadcast_updates():
+    global tick_time
+    tick = 0
+    last_nodes = []
+    last_metrics = None
+    last_log_count = log_count
+    
     while True:
         await asyncio.sleep(1.0)
+        tick += 1
+        tick_time = time.time()
         if not active_connections:
             continue
         
-        data = {
-            'nodes': [n.get_state() for n in nodes_ref] if nodes_ref else [],
-            'metrics': metrics_ref.get_summary() if metrics_ref else {},
-            'logs': list(log_buffer)[-20:],
-            'timestamp': time.time()
-        }
+        data = refresh_frame()
+        nodes = data['nodes']
+        # uptime_seconds moves every tick and isn't shown, so it alone isn't a change
+        metrics = {k: v for k, v in data['metrics'].items() if k != 'uptime_seconds'}
         
-        for conn in active_connections[:]:
-            try:
-                await conn.send_json(data)
-            except:
-                active_connections.remove(conn)
+        # Between keyframes only changed nodes, new logs and changed metrics go
+        # out, and nothing at all when none of them changed
+        if tick % KEYFRAME_EVERY == 0 or len(nodes) != len(last_nodes):
+            delta_frame = latest_frame
+        else:
+            new_logs = min(log_count - last_log_count, len(recent_logs))
+            delta = {
+                'nodes_patch': [node for node, last in zip(nodes, last_nodes) if node != last],
+                'logs_append': list(islice(recent_logs, len(recent_logs) - new_logs, None)),
+                'timestamp': data['timestamp']
+            }
+            if metrics != last_metrics:
+                delta['metrics'] = data['metrics']
+            delta_frame = None
+            if delta['nodes_patch'] or delta['logs_append'] or 'metrics' in delta:
+                delta_frame = encode_capped(delta, 'logs_append')
+        last_nodes = nodes
+        last_metrics = metrics
+        last_log_count = log_count
+        
+        # Each client gets at most one write per tick, carrying the state and
+        # every log entry since its last write. A client still sending is
+        # corked: it skips the tick and, once drained, gets one full frame
+        # covering what it missed. Sends run concurrently in the background
+        for conn in tuple(active_connections):
+            if conn in busy_connections:
+                if delta_frame is not None:
+                    stale_connections.add(conn)
+                continue
+            if conn in stale_connections:
+                frame = latest_frame
+            elif delta_frame is None:
+                continue
+            else:
+                frame = delta_frame
+            stale_connections.discard(conn)
+            start_send(conn, frame)
+
+def start_send(conn: WebSocket, frame: bytes):
+    """Send a frame in the background, marking the client busy until it's done"""
+    busy_connections.add(conn)
+    task = asyncio.create_task(send_then_clear(conn, frame))
+    send_tasks.add(task)
+    task.add_done_callback(send_tasks.discard)
+
+async def send_then_clear(conn: WebSocket, frame: bytes):
+    try:
+        await conn.send_bytes(frame)
+    except Exception:
+        active_connections.discard(conn)
+    finally:
+        busy_connections.discard(conn)
 
 def get_html():
     return """
@@ -218,12 +338,41 @@ def get_html():
     
     <script>
         const ws = new WebSocket(`ws://${window.location.host}/ws/live`);
-        
+        ws.binaryType = 'arraybuffer';
+""" + DECODE_FRAME_JS + """
         ws.onmessage = (event) => {
-            const data = JSON.parse(event.data);
-            updateDashboard(data);
+            applyFrame(decodeFrame(event.data));
         };
         
+        // Full frames carry nodes/logs; deltas carry nodes_patch/logs_append
+        // and metrics only when they changed
+        const state = { nodes: [], metrics: {}, logs: [] };
+        const nodeIndex = new Map();  // node_id -> index in state.nodes
+        
+        function applyFrame(data) {
+            if (data.nodes) {
+                state.nodes = data.nodes;
+                state.logs = data.logs || [];
+                nodeIndex.clear();
+                state.nodes.forEach((node, i) => nodeIndex.set(node.node_id, i));
+            } else {
+                (data.nodes_patch || []).forEach(node => {
+                    const i = nodeIndex.get(node.node_id);
+                    if (i !== undefined) state.nodes[i] = node;
+                });
+                if (data.logs_append && data.logs_append.length) {
+                    state.logs = state.logs.concat(data.logs_append).slice(-20);
+                }
+            }
+            if (data.metrics) state.metrics = data.metrics;
+            updateDashboard(state);
+        }
+        
+        const nodeCards = new Map();  // node_id -> {el, protocolLabel, stats, protocol}
+        const lineCache = new Map();  // node_id -> SVG line
+        let lastBrokerX = null;
+        let lastBrokerY = null;
+        
         function updateDashboard(data) {
             const nodes = data.nodes || [];
             const metrics = data.metrics || {};
@@ -234,15 +383,32 @@ def get_html():
             document.getElementById('delivery').textContent = ((metrics.delivery_ratio || 0) * 100).toFixed(0) + '%';
             document.getElementById('latency').textContent = (metrics.avg_latency_ms || 0).toFixed(0) + 'ms';
             
-            // Update nodes in topology
+            // Update nodes in topology; cards are created once per node
             const container = document.getElementById('nodes-container');
-            container.innerHTML = nodes.map((node, i) => `
-                <div class="node ${node.protocol}" style="animation-delay: ${i * 0.1}s">
-                    <div class="node-label">${node.node_id}</div>
-                    <div class="node-protocol">${node.protocol.toUpperCase()}</div>
-                    <div class="node-stats">📤 ${node.stats.messages_sent} | 🔋 ${node.battery.toFixed(0)}%</div>
-                </div>
-            `).join('');
+            const seen = new Set();
+            nodes.forEach((node, i) => {
+                seen.add(node.node_id);
+                let card = nodeCards.get(node.node_id);
+                if (!card) {
+                    card = createNodeCard(node, i);
+                    nodeCards.set(node.node_id, card);
+                    container.appendChild(card.el);
+                }
+                if (card.protocol !== node.protocol) {
+                    // nodes can switch protocol at runtime
+                    card.protocol = node.protocol;
+                    card.el.className = `node ${node.protocol}`;
+                    card.protocolLabel.textContent = node.protocol.toUpperCase();
+                }
+                const stats = `📤 ${node.stats.messages_sent} | 🔋 ${node.battery.toFixed(0)}%`;
+                if (card.stats.textContent !== stats) card.stats.textContent = stats;
+            });
+            nodeCards.forEach((card, id) => {
+                if (!seen.has(id)) {
+                    card.el.remove();
+                    nodeCards.delete(id);
+                }
+            });
             
             // Draw connection lines
             drawConnections(nodes);
@@ -273,34 +439,61 @@ def get_html():
             }
         }
         
+        function createNodeCard(node, i) {
+            const el = document.createElement('div');
+            el.style.animationDelay = `${i * 0.1}s`;
+            el.innerHTML = `
+                <div class="node-label">${node.node_id}</div>
+                <div class="node-protocol"></div>
+                <div class="node-stats"></div>
+            `;
+            return {
+                el,
+                protocolLabel: el.querySelector('.node-protocol'),
+                stats: el.querySelector('.node-stats'),
+                protocol: null  // set on the first update
+            };
+        }
+        
         function drawConnections(nodes) {
             const svg = document.getElementById('connections');
             const topology = document.getElementById('topology');
-            const rect = topology.getBoundingClientRect();
+            const topologyRect = topology.getBoundingClientRect();
             
             // Broker position (center top)
-            const brokerX = rect.width / 2;
-            const brokerY = rect.height * 0.2;
-            
-            // Clear existing lines
-            svg.innerHTML = '';
+            const brokerX = topologyRect.width / 2;
+            const brokerY = topologyRect.height * 0.2 + 40;
+            const brokerMoved = brokerX !== lastBrokerX || brokerY !== lastBrokerY;
+            lastBrokerX = brokerX;
+            lastBrokerY = brokerY;
             
-            // Draw lines from broker to each node
-            const nodeElements = document.querySelectorAll('.node');
-            nodeElements.forEach((nodeEl, i) => {
-                const nodeRect = nodeEl.getBoundingClientRect();
-                const topologyRect = topology.getBoundingClientRect();
-                
+            // Lines from broker to each node persist; only endpoints change
+            nodes.forEach(node => {
+                const card = nodeCards.get(node.node_id);
+                const nodeRect = card.el.getBoundingClientRect();
                 const nodeX = nodeRect.left - topologyRect.left + nodeRect.width / 2;
                 const nodeY = nodeRect.top - topologyRect.top + nodeRect.height / 2;
                 
-                const line = document.createElementNS('http://www.w3.org/2000/svg', 'line');
-                line.setAttribute('x1', brokerX);
-                line.setAttribute('y1', brokerY + 40);
+                let line = lineCache.get(node.node_id);
+                if (!line) {
+                    line = document.createElementNS('http://www.w3.org/2000/svg', 'line');
+                    line.setAttribute('class', 'connection-line active');
+                    line.setAttribute('x1', brokerX);
+                    line.setAttribute('y1', brokerY);
+                    svg.appendChild(line);
+                    lineCache.set(node.node_id, line);
+                } else if (brokerMoved) {
+                    line.setAttribute('x1', brokerX);
+                    line.setAttribute('y1', brokerY);
+                }
                 line.setAttribute('x2', nodeX);
                 line.setAttribute('y2', nodeY);
-                line.setAttribute('class', 'connection-line active');
-                svg.appendChild(line);
+            });
+            lineCache.forEach((line, id) => {
+                if (!nodeCards.has(id)) {
+                    line.remove();
+                    lineCache.delete(id);
+                }
             });
         }
         
@@ -315,6 +508,12 @@ def get_html():
 </html>
     """
 
+# The page is static: encode it once at import
+HTML_BYTES = get_html().encode('utf-8')
+HTML_GZIP = gzip.compress(HTML_BYTES, compresslevel=9)
+HTML_HEADERS = {'Cache-Control': 'public, max-age=3600', 'Vary': 'Accept-Encoding'}
+HTML_GZIP_HEADERS = {**HTML_HEADERS, 'Content-Encoding': 'gzip'}
+
 # Export for main.py
 start_dashboard = start_dashboard
 add_log = add_log
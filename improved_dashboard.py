@@ -805,7 +805,10 @@ HTML_CONTENT = """
             box-shadow: 0 2px 8px rgba(0,0,0,0.08);
         }
         
-        #network-canvas {
+        #network-bg, #network-fx {
+            position: absolute;
+            top: 0;
+            left: 0;
             width: 100%;
             height: 100%;
         }
@@ -1023,7 +1026,8 @@ HTML_CONTENT = """
     
     <div id="container">
         <div id="canvas-container">
-            <canvas id="network-canvas"></canvas>
+            <canvas id="network-bg"></canvas>
+            <canvas id="network-fx"></canvas>
         </div>
         
         <div id="sidebar">
@@ -1100,19 +1104,452 @@ HTML_CONTENT = """
 
 <script>
     const ws = new WebSocket('ws://localhost:8000/ws');
-    const canvas = document.getElementById('network-canvas');
-    const ctx = canvas.getContext('2d');
+    const canvasContainer = document.getElementById('canvas-container');
+    
+    // DOM elements touched on every telemetry message, looked up once
+    const ui = {
+        msgCount: document.getElementById('msg-count'),
+        activeNodes: document.getElementById('active-nodes'),
+        deliveryRatio: document.getElementById('delivery-ratio'),
+        avgLatency: document.getElementById('avg-latency'),
+        duplicates: document.getElementById('duplicates'),
+        energyConsumption: document.getElementById('energy-consumption'),
+        configInfo: document.getElementById('config-info'),
+        nodeCountDisplay: document.getElementById('node-count-display'),
+        topicHeatmap: document.getElementById('topic-heatmap'),
+        queueSparkline: document.getElementById('queue-sparkline'),
+        nodeList: document.getElementById('node-list'),
+        messageLog: document.getElementById('message-log')
+    };
     
     let nodes = [];
     let broker = null;
-    let messages = [];
     let stats = {};
     let startTime = Date.now();
     
+    // Network renderer: owns the node/pulse state and both canvas layers.
+    // It is self-contained so the same source can run in a worker (via
+    // OffscreenCanvas) or, where that is unavailable, on the main thread.
+    function createNetworkRenderer(canvas, fxCanvas) {
+        const ctx = canvas.getContext('2d', { alpha: false, desynchronized: true });
+        const fxCtx = fxCanvas.getContext('2d');
+        const nextFrame = typeof requestAnimationFrame === 'function'
+            ? requestAnimationFrame
+            : (callback) => setTimeout(() => callback(performance.now()), 16);
+        
+        // Render at most ~60fps on high refresh displays (the threshold sits just
+        // under 16.7ms to tolerate frame timing jitter), and advance pulses by
+        // elapsed time, capped so a throttled tab doesn't jump them to the end
+        const MIN_FRAME_MS = 15;
+        const MAX_STEP_MS = 50;
+        const PULSE_SPEED = 0.00108;  // progress per ms (0.018 per 60fps frame)
+        let lastRender = performance.now();
+        
+        let nodes = [];
+        let broker = null;
+        let messages = [];
+        
+        // Pre-rendered two-line node labels (device name + protocol), keyed by node id.
+        // Labels are static per node, so they are rasterized once and blitted each frame.
+        const LABEL_WIDTH = 96;
+        const LABEL_HEIGHT = 32;
+        let labelCache = new Map();
+        
+        // Pre-rendered node discs (fill + outline), one per color/connected pair.
+        // Each node is then a single image blit instead of path rasterization.
+        const NODE_SPRITE_SIZE = 50;
+        const nodeSprites = [];  // indexed by colorIdx * 2 + connected
+        
+        // The broker never changes, so its disc and text are rendered once too
+        const BROKER_SPRITE_SIZE = 76;
+        let brokerSprite = null;
+        
+        // Cached ring layout for the current node count and canvas size
+        let layout = null;
+        // Edge paths and per-node render data for the current node list
+        let scene = null;
+        
+        // Set whenever the static layer must be repainted
+        let dirty = true;
+        // Whether the pulse layer still shows pulses from the previous frame
+        let pulsesDrawn = false;
+        
+        const TAU = 6.283185307179586;
+        const HALF_PI = 1.5707963267948966;
+        
+        // Node fill colors, indexed by a small per-protocol code (0 = WiFi, the fallback)
+        const NODE_COLORS = ['#16a34a', '#2563eb'];
+        const NODE_COLOR_IDX = { BLE: 1, ble: 1, WIFI: 0, wifi: 0 };
+        
+        // Message pulse colors: green for WiFi, blue for Bluetooth, orange otherwise
+        const PULSE_COLOR = { BLE: '#2563eb', ble: '#2563eb', WIFI: '#16a34a', wifi: '#16a34a' };
+        
+        function createBitmapCanvas(width, height) {
+            if (typeof OffscreenCanvas !== 'undefined') {
+                return new OffscreenCanvas(width, height);
+            }
+            const bitmap = document.createElement('canvas');
+            bitmap.width = width;
+            bitmap.height = height;
+            return bitmap;
+        }
+        
+        function getNodeLabel(node) {
+            const key = node.id + '|' + (node.name || '') + '|' + node.protocol;
+            const cached = labelCache.get(node.id);
+            if (cached && cached.key === key) {
+                return cached.image;
+            }
+            
+            // Display device name without index (e.g., "Field Sensor" instead of "Field Sensor #1")
+            let displayName = node.name || node.id.split('_').pop();
+            // Remove the "#X" part if it exists
+            displayName = displayName.replace(/\s*#\d+\s*$/, '');
+            
+            // Always show device name on first line, protocol on second line
+            // For long names, truncate or split appropriately
+            let firstLine = displayName;
+            if (displayName.length > 14) {
+                const words = displayName.split(' ');
+                if (words.length > 1) {
+                    // Try to fit first two words, otherwise just first word
+                    firstLine = words.length >= 2 && (words[0] + ' ' + words[1]).length <= 14 
+                        ? words[0] + ' ' + words[1]
+                        : words[0];
+                } else {
+                    // Single long word - truncate
+                    firstLine = displayName.substring(0, 14);
+                }
+            }
+            
+            const image = createBitmapCanvas(LABEL_WIDTH, LABEL_HEIGHT);
+            const labelCtx = image.getContext('2d');
+            labelCtx.textAlign = 'center';
+            labelCtx.textBaseline = 'middle';
+            labelCtx.fillStyle = '#1f2937';
+            labelCtx.font = 'bold 10px Arial';
+            labelCtx.fillText(firstLine, LABEL_WIDTH / 2, 6);
+            
+            // Always show protocol on second line
+            labelCtx.font = '9px Arial';
+            labelCtx.fillStyle = '#6b7280';
+            labelCtx.fillText(node.protocol, LABEL_WIDTH / 2, 18);
+            
+            labelCache.set(node.id, { key, image });
+            return image;
+        }
+        
+        function getNodeSprite(colorIdx, connected) {
+            const key = colorIdx * 2 + connected;
+            let sprite = nodeSprites[key];
+            if (sprite) return sprite;
+            
+            const half = NODE_SPRITE_SIZE / 2;
+            sprite = createBitmapCanvas(NODE_SPRITE_SIZE, NODE_SPRITE_SIZE);
+            const spriteCtx = sprite.getContext('2d');
+            spriteCtx.beginPath();
+            spriteCtx.arc(half, half, 22, 0, TAU);
+            spriteCtx.fillStyle = NODE_COLORS[colorIdx];
+            spriteCtx.fill();
+            spriteCtx.lineWidth = 3;
+            spriteCtx.strokeStyle = connected ? '#1f2937' : '#9ca3af';
+            spriteCtx.stroke();
+            
+            nodeSprites[key] = sprite;
+            return sprite;
+        }
+        
+        function getBrokerSprite() {
+            if (brokerSprite) return brokerSprite;
+            
+            const half = BROKER_SPRITE_SIZE / 2;
+            brokerSprite = createBitmapCanvas(BROKER_SPRITE_SIZE, BROKER_SPRITE_SIZE);
+            const spriteCtx = brokerSprite.getContext('2d');
+            spriteCtx.fillStyle = '#dc2626';
+            spriteCtx.beginPath();
+            spriteCtx.arc(half, half, 35, 0, TAU);
+            spriteCtx.fill();
+            spriteCtx.strokeStyle = '#991b1b';
+            spriteCtx.lineWidth = 3;
+            spriteCtx.stroke();
+            
+            spriteCtx.fillStyle = 'white';
+            spriteCtx.font = 'bold 16px Arial';
+            spriteCtx.textAlign = 'center';
+            spriteCtx.textBaseline = 'middle';
+            spriteCtx.fillText('MQTT', half, half - 6);
+            spriteCtx.font = '12px Arial';
+            spriteCtx.fillText('Broker', half, half + 10);
+            return brokerSprite;
+        }
+        
+        // Ring positions and center-to-node edge endpoints. These depend only on the
+        // node count and canvas size, so they survive connection/stat updates.
+        function getLayout(centerX, centerY, radius) {
+            const n = nodes.length;
+            if (layout && layout.count === n && layout.width === canvas.width && layout.height === canvas.height) {
+                return layout;
+            }
+            
+            layout = {
+                count: n,
+                width: canvas.width,
+                height: canvas.height,
+                xs: new Float32Array(n),
+                ys: new Float32Array(n),
+                edgeCoords: new Float32Array(n * 4)
+            };
+            const step = TAU / n;
+            for (let i = 0; i < n; i++) {
+                const angle = i * step - HALF_PI;
+                // Whole-pixel centers keep sprite and label blits on the pixel grid
+                const x = Math.round(centerX + Math.cos(angle) * radius);
+                const y = Math.round(centerY + Math.sin(angle) * radius);
+                layout.xs[i] = x;
+                layout.ys[i] = y;
+                
+                const b = i * 4;
+                layout.edgeCoords[b] = centerX;
+                layout.edgeCoords[b + 1] = centerY;
+                layout.edgeCoords[b + 2] = x;
+                layout.edgeCoords[b + 3] = y;
+            }
+            return layout;
+        }
+        
+        function buildScene(centerX, centerY, radius) {
+            const { xs, ys, edgeCoords } = getLayout(centerX, centerY, radius);
+            const n = nodes.length;
+            const built = {
+                nodes: nodes,
+                width: canvas.width,
+                height: canvas.height,
+                centerX: centerX,
+                centerY: centerY,
+                // Per-node render data as parallel typed arrays
+                xs: xs,
+                ys: ys,
+                colorIdx: new Uint8Array(n),
+                connected: new Uint8Array(n),
+                indexById: new Map(),
+                connectedEdges: new Path2D(),
+                dimEdges: new Path2D()
+            };
+            
+            for (let i = 0; i < n; i++) {
+                const node = nodes[i];
+                built.indexById.set(node.id, i);
+                built.colorIdx[i] = NODE_COLOR_IDX[node.protocol] || 0;
+                built.connected[i] = node.connected ? 1 : 0;
+                
+                const b = i * 4;
+                const edges = built.connected[i] ? built.connectedEdges : built.dimEdges;
+                edges.moveTo(edgeCoords[b], edgeCoords[b + 1]);
+                edges.lineTo(edgeCoords[b + 2], edgeCoords[b + 3]);
+            }
+            
+            return built;
+        }
+        
+        // Static layer: edges, broker, nodes and labels. Repainted only when
+        // the node list, connection states or canvas size change.
+        function drawStatic() {
+            // Opaque layer: paint the panel background instead of clearing
+            ctx.fillStyle = '#ffffff';
+            ctx.fillRect(0, 0, canvas.width, canvas.height);
+            
+            if (!broker || nodes.length === 0) {
+                scene = null;
+                return;
+            }
+            
+            const centerX = Math.round(canvas.width / 2);
+            const centerY = Math.round(canvas.height / 2);
+            const radius = Math.min(canvas.width, canvas.height) * 0.35;
+            
+            // Positions and batched paths only change with the node list or canvas size
+            if (!scene || scene.nodes !== nodes || scene.width !== canvas.width || scene.height !== canvas.height) {
+                scene = buildScene(centerX, centerY, radius);
+            }
+            
+            // Pass 1: connection lines, one stroke per connected state
+            ctx.strokeStyle = '#9ca3af';
+            ctx.lineWidth = 2;
+            ctx.stroke(scene.connectedEdges);
+            ctx.strokeStyle = '#e5e7eb';
+            ctx.lineWidth = 1;
+            ctx.stroke(scene.dimEdges);
+            
+            // Pass 2: broker disc and its "MQTT"/"Broker" caption, one blit
+            const brokerHalf = BROKER_SPRITE_SIZE / 2;
+            ctx.drawImage(getBrokerSprite(), centerX - brokerHalf, centerY - brokerHalf);
+            
+            // Pass 3: node discs blitted from the pre-rendered sprites
+            const half = NODE_SPRITE_SIZE / 2;
+            const { xs, ys, colorIdx, connected } = scene;
+            for (let i = 0, n = xs.length; i < n; i++) {
+                ctx.drawImage(getNodeSprite(colorIdx[i], connected[i]), xs[i] - half, ys[i] - half);
+            }
+            
+            // Pass 4: device name and protocol labels (cached per node)
+            const labelOffset = LABEL_WIDTH / 2;
+            for (let i = 0, n = nodes.length; i < n; i++) {
+                ctx.drawImage(getNodeLabel(nodes[i]), scene.xs[i] - labelOffset, scene.ys[i] + 28);
+            }
+        }
+        
+        // Pulse layer: cleared and redrawn every frame while pulses are in flight
+        function drawDynamic(dt) {
+            fxCtx.clearRect(0, 0, fxCanvas.width, fxCanvas.height);
+            pulsesDrawn = false;
+            if (!scene) return;
+            
+            // Advance message pulses, compacting finished ones in place
+            let kept = 0;
+            for (let r = 0; r < messages.length; r++) {
+                const msg = messages[r];
+                msg.progress += dt * PULSE_SPEED;
+                if (msg.progress > 1) continue;
+                
+                const fromIdx = scene.indexById.get(msg.from);
+                if (fromIdx === undefined) continue;
+                
+                msg.fromIdx = fromIdx;
+                messages[kept++] = msg;
+            }
+            messages.length = kept;
+            
+            // Batch pulses into one path per color and alpha step (0.05), so
+            // fillStyle/globalAlpha are set once per batch rather than per pulse
+            const batches = new Map();
+            for (let k = 0; k < kept; k++) {
+                const msg = messages[k];
+                const step = Math.round((1 - msg.progress * 0.6) * 20);
+                const key = msg.color + step;
+                let batch = batches.get(key);
+                if (!batch) {
+                    batch = { color: msg.color, alpha: step / 20, path: new Path2D() };
+                    batches.set(key, batch);
+                }
+                
+                const fromX = scene.xs[msg.fromIdx];
+                const fromY = scene.ys[msg.fromIdx];
+                const x = fromX + (scene.centerX - fromX) * msg.progress;
+                const y = fromY + (scene.centerY - fromY) * msg.progress;
+                batch.path.moveTo(x + 7, y);
+                batch.path.arc(x, y, 7, 0, TAU);
+            }
+            
+            for (const batch of batches.values()) {
+                fxCtx.fillStyle = batch.color;
+                fxCtx.globalAlpha = batch.alpha;
+                fxCtx.fill(batch.path);
+            }
+            fxCtx.globalAlpha = 1;
+            pulsesDrawn = kept > 0;
+        }
+        
+        function draw(now) {
+            if (now - lastRender < MIN_FRAME_MS) {
+                nextFrame(draw);
+                return;
+            }
+            const dt = Math.min(now - lastRender, MAX_STEP_MS);
+            lastRender = now;
+            
+            if (dirty) {
+                drawStatic();
+                dirty = false;
+            }
+            if (messages.length > 0 || pulsesDrawn) {
+                drawDynamic(dt);
+            }
+            nextFrame(draw);
+        }
+        
+        nextFrame(draw);
+        
+        return {
+            handle(msg) {
+                if (msg.type === 'init') {
+                    nodes = msg.nodes;
+                    broker = msg.broker;
+                    messages = [];
+                    labelCache = new Map();
+                    dirty = true;
+                } else if (msg.type === 'update') {
+                    nodes = msg.nodes;
+                    dirty = true;
+                } else if (msg.type === 'pulse') {
+                    // Visual message pulse travelling from the node to the broker
+                    messages.push({
+                        from: msg.from,
+                        to: 'broker',
+                        progress: 0,
+                        protocol: msg.protocol,
+                        color: PULSE_COLOR[msg.protocol] || '#f59e0b',
+                        fromIdx: -1
+                    });
+                } else if (msg.type === 'resize') {
+                    canvas.width = msg.width;
+                    canvas.height = msg.height;
+                    fxCanvas.width = msg.width;
+                    fxCanvas.height = msg.height;
+                    // Resizing resets context state; sprites are drawn 1:1, so no smoothing
+                    ctx.imageSmoothingEnabled = false;
+                    fxCtx.imageSmoothingEnabled = false;
+                    dirty = true;
+                }
+            }
+        };
+    }
+    
+    // Worker entry point: receives the transferred canvases, then forwards
+    // every later message to the renderer
+    function networkRendererWorker() {
+        let renderer = null;
+        self.onmessage = (event) => {
+            const msg = event.data;
+            if (msg.type === 'setup') {
+                renderer = createNetworkRenderer(msg.canvas, msg.fxCanvas);
+            } else if (renderer) {
+                renderer.handle(msg);
+            }
+        };
+    }
+    
+    // Render off the main thread when the browser can transfer canvas control
+    function startNetworkRenderer() {
+        const bgCanvas = document.getElementById('network-bg');
+        const fxCanvas = document.getElementById('network-fx');
+        
+        if (typeof Worker !== 'undefined' && bgCanvas.transferControlToOffscreen) {
+            try {
+                const source = createNetworkRenderer.toString() + '\\n(' + networkRendererWorker.toString() + ')();';
+                const workerUrl = URL.createObjectURL(new Blob([source], { type: 'text/javascript' }));
+                const worker = new Worker(workerUrl);
+                const bgOffscreen = bgCanvas.transferControlToOffscreen();
+                const fxOffscreen = fxCanvas.transferControlToOffscreen();
+                worker.postMessage({ type: 'setup', canvas: bgOffscreen, fxCanvas: fxOffscreen }, [bgOffscreen, fxOffscreen]);
+                return (msg) => worker.postMessage(msg);
+            } catch (e) {
+                console.warn('Worker rendering unavailable, drawing on main thread', e);
+            }
+        }
+        
+        const renderer = createNetworkRenderer(bgCanvas, fxCanvas);
+        return (msg) => renderer.handle(msg);
+    }
+    
+    const postToRenderer = startNetworkRenderer();
+    
     // Set canvas size
     function resizeCanvas() {
-        canvas.width = canvas.offsetWidth;
-        canvas.height = canvas.offsetHeight;
+        postToRenderer({
+            type: 'resize',
+            width: canvasContainer.clientWidth,
+            height: canvasContainer.clientHeight
+        });
     }
     resizeCanvas();
     window.addEventListener('resize', resizeCanvas);
@@ -1121,43 +1558,54 @@ HTML_CONTENT = """
         console.log('Connected to simulation');
     };
     
+    // Telemetry snapshots are coalesced: only the latest one is applied, once
+    // per animation frame, so bursts of updates cause a single round of DOM writes
+    let pendingUpdate = null;
+    
+    function applyPendingUpdate() {
+        const data = pendingUpdate;
+        pendingUpdate = null;
+        if (!data) return;
+        
+        nodes = data.nodes;
+        stats = data.stats;
+        postToRenderer({ type: 'update', nodes: nodes });
+        updateStats();
+        updateNodeList();
+    }
+    
     ws.onmessage = (event) => {
         const data = JSON.parse(event.data);
         
         if (data.type === 'init') {
             // Clear everything on initialization to start fresh at 0
+            pendingUpdate = null;
             nodes = [];
             broker = null;
-            messages = [];
             stats = {};
             queueHistory = [];
-            document.getElementById('message-log').innerHTML = '';
-            document.getElementById('msg-count').textContent = '0';
-            document.getElementById('active-nodes').textContent = '0';
-            document.getElementById('delivery-ratio').textContent = '0%';
-            document.getElementById('avg-latency').textContent = '0ms';
-            document.getElementById('duplicates').textContent = '0';
-            document.getElementById('energy-consumption').textContent = '0';
+            ui.messageLog.innerHTML = '';
+            ui.msgCount.textContent = '0';
+            ui.activeNodes.textContent = '0';
+            ui.deliveryRatio.textContent = '0%';
+            ui.avgLatency.textContent = '0ms';
+            ui.duplicates.textContent = '0';
+            ui.energyConsumption.textContent = '0';
             
             nodes = data.nodes;
             broker = data.broker;
+            postToRenderer({ type: 'init', nodes: nodes, broker: broker });
             updateConfigInfo();
         } else if (data.type === 'update') {
-            nodes = data.nodes;
-            stats = data.stats;
-            updateStats();
-            updateNodeList();
+            if (!pendingUpdate) {
+                requestAnimationFrame(applyPendingUpdate);
+            }
+            pendingUpdate = data;
         } else if (data.type === 'message') {
             addMessageLog(data);
             // Add visual message pulse (only for PUBLISH, not for received messages)
             if (data.msg_type === 'PUBLISH') {
-                messages.push({
-                    from: data.from,
-                    to: 'broker',
-                    progress: 0,
-                    type: data.msg_type,
-                    protocol: data.protocol || 'UNKNOWN'
-                });
+                postToRenderer({ type: 'pulse', from: data.from, protocol: data.protocol || 'UNKNOWN' });
             }
         }
     };
@@ -1165,9 +1613,9 @@ HTML_CONTENT = """
     function updateConfigInfo() {
         const bleCount = nodes.filter(n => n.protocol === 'BLE').length;
         const wifiCount = nodes.filter(n => n.protocol === 'WIFI').length;
-        document.getElementById('config-info').textContent = 
+        ui.configInfo.textContent = 
             `${nodes.length} nodes (${bleCount} BLE, ${wifiCount} WiFi)`;
-        document.getElementById('node-count-display').textContent = nodes.length;
+        ui.nodeCountDisplay.textContent = nodes.length;
     }
     
     // Queue depth history for sparkline
@@ -1175,13 +1623,13 @@ HTML_CONTENT = """
     const maxQueueHistory = 50;
     
     function updateStats() {
-        document.getElementById('msg-count').textContent = stats.total_messages || 0;
-        document.getElementById('active-nodes').textContent = stats.active_nodes || 0;
-        document.getElementById('delivery-ratio').textContent = (stats.delivery_ratio || 0).toFixed(1) + '%';
-        document.getElementById('avg-latency').textContent = (stats.avg_latency_ms || 0).toFixed(1) + 'ms';
-        document.getElementById('duplicates').textContent = stats.total_duplicates || 0;
+        ui.msgCount.textContent = stats.total_messages || 0;
+        ui.activeNodes.textContent = stats.active_nodes || 0;
+        ui.deliveryRatio.textContent = (stats.delivery_ratio || 0).toFixed(1) + '%';
+        ui.avgLatency.textContent = (stats.avg_latency_ms || 0).toFixed(1) + 'ms';
+        ui.duplicates.textContent = stats.total_duplicates || 0;
         // Convert from mJ to Joules (divide by 1000)
-        document.getElementById('energy-consumption').textContent = (stats.total_energy_mj || 0).toFixed(3);
+        ui.energyConsumption.textContent = (stats.total_energy_mj || 0).toFixed(3);
         
         // Update topic heatmap
         updateTopicHeatmap(stats.topic_heatmap || {});
@@ -1195,7 +1643,7 @@ HTML_CONTENT = """
     }
     
     function updateTopicHeatmap(heatmap) {
-        const container = document.getElementById('topic-heatmap');
+        const container = ui.topicHeatmap;
         const entries = Object.entries(heatmap).sort((a, b) => b[1] - a[1]).slice(0, 10);
         
         if (entries.length === 0) {
@@ -1268,7 +1716,7 @@ HTML_CONTENT = """
     }
     
     function updateQueueSparkline() {
-        const canvas = document.getElementById('queue-sparkline');
+        const canvas = ui.queueSparkline;
         if (!canvas) return;
         
         const ctx = canvas.getContext('2d');
@@ -1332,7 +1780,7 @@ HTML_CONTENT = """
     }
     
     function updateNodeList() {
-        const list = document.getElementById('node-list');
+        const list = ui.nodeList;
         list.innerHTML = '';
         
         nodes.forEach(node => {
@@ -1364,7 +1812,7 @@ HTML_CONTENT = """
     }
     
     function addMessageLog(data) {
-        const log = document.getElementById('message-log');
+        const log = ui.messageLog;
         const entry = document.createElement('div');
         
         const time = new Date().toLocaleTimeString();
@@ -1422,141 +1870,6 @@ HTML_CONTENT = """
         }
     }
     
-    function draw() {
-        ctx.clearRect(0, 0, canvas.width, canvas.height);
-        
-        if (!broker || nodes.length === 0) {
-            requestAnimationFrame(draw);
-            return;
-        }
-        
-        const centerX = canvas.width / 2;
-        const centerY = canvas.height / 2;
-        const radius = Math.min(canvas.width, canvas.height) * 0.35;
-        
-        // Draw connection lines first - organized circular layout
-        nodes.forEach((node, i) => {
-            const angle = (i / nodes.length) * Math.PI * 2 - Math.PI / 2;
-            const x = centerX + Math.cos(angle) * radius;
-            const y = centerY + Math.sin(angle) * radius;
-            
-            if (node.connected) {
-                ctx.strokeStyle = '#9ca3af';
-                ctx.lineWidth = 2;
-            } else {
-                ctx.strokeStyle = '#e5e7eb';
-                ctx.lineWidth = 1;
-            }
-            ctx.beginPath();
-            ctx.moveTo(centerX, centerY);
-            ctx.lineTo(x, y);
-            ctx.stroke();
-        });
-        
-        // Draw broker
-        ctx.fillStyle = '#dc2626';
-        ctx.beginPath();
-        ctx.arc(centerX, centerY, 35, 0, Math.PI * 2);
-        ctx.fill();
-        ctx.strokeStyle = '#991b1b';
-        ctx.lineWidth = 3;
-        ctx.stroke();
-        
-        ctx.fillStyle = 'white';
-        ctx.font = 'bold 16px Arial';
-        ctx.textAlign = 'center';
-        ctx.textBaseline = 'middle';
-        ctx.fillText('MQTT', centerX, centerY - 6);
-        ctx.font = '12px Arial';
-        ctx.fillText('Broker', centerX, centerY + 10);
-        
-        // Draw nodes - organized circular layout
-        nodes.forEach((node, i) => {
-            const angle = (i / nodes.length) * Math.PI * 2 - Math.PI / 2;
-            const x = centerX + Math.cos(angle) * radius;
-            const y = centerY + Math.sin(angle) * radius;
-            
-            ctx.fillStyle = node.protocol === 'BLE' ? '#2563eb' : '#16a34a';
-            ctx.beginPath();
-            ctx.arc(x, y, 22, 0, Math.PI * 2);
-            ctx.fill();
-            
-            ctx.strokeStyle = node.connected ? '#1f2937' : '#9ca3af';
-            ctx.lineWidth = 3;
-            ctx.stroke();
-            
-            // Display device name without index (e.g., "Field Sensor" instead of "Field Sensor #1")
-            let displayName = node.name || node.id.split('_').pop();
-            // Remove the "#X" part if it exists
-            displayName = displayName.replace(/\s*#\d+\s*$/, '');
-            
-            ctx.fillStyle = '#1f2937';
-            ctx.font = 'bold 10px Arial';
-            ctx.textAlign = 'center';
-            ctx.textBaseline = 'middle';
-            
-            // Always show device name on first line, protocol on second line
-            // For long names, truncate or split appropriately
-            if (displayName.length > 14) {
-                const words = displayName.split(' ');
-                if (words.length > 1) {
-                    // Try to fit first two words, otherwise just first word
-                    const firstLine = words.length >= 2 && (words[0] + ' ' + words[1]).length <= 14 
-                        ? words[0] + ' ' + words[1]
-                        : words[0];
-                    ctx.fillText(firstLine, x, y + 34);
-                } else {
-                    // Single long word - truncate
-                    ctx.fillText(displayName.substring(0, 14), x, y + 34);
-                }
-            } else {
-                // Short name - show full device name
-                ctx.fillText(displayName, x, y + 34);
-            }
-            
-            // Always show protocol on second line
-            ctx.font = '9px Arial';
-            ctx.fillStyle = '#6b7280';
-            ctx.fillText(node.protocol, x, y + 46);
-        });
-        
-        // Draw message pulses
-        messages = messages.filter(msg => {
-            msg.progress += 0.018;
-            if (msg.progress > 1) return false;
-            
-            const fromNode = nodes.find(n => n.id === msg.from);
-            if (!fromNode) return false;
-            
-            const fromIdx = nodes.indexOf(fromNode);
-            const angle = (fromIdx / nodes.length) * Math.PI * 2 - Math.PI / 2;
-            const fromX = centerX + Math.cos(angle) * radius;
-            const fromY = centerY + Math.sin(angle) * radius;
-            
-            const x = fromX + (centerX - fromX) * msg.progress;
-            const y = fromY + (centerY - fromY) * msg.progress;
-            
-            // Color code by protocol: green for WiFi, blue for Bluetooth
-            let pulseColor = '#f59e0b'; // default orange
-            if (msg.protocol === 'WIFI' || msg.protocol === 'wifi') {
-                pulseColor = '#16a34a'; // green for WiFi
-            } else if (msg.protocol === 'BLE' || msg.protocol === 'ble') {
-                pulseColor = '#2563eb'; // blue for Bluetooth
-            }
-            ctx.fillStyle = pulseColor;
-            ctx.globalAlpha = 1 - msg.progress * 0.6;
-            ctx.beginPath();
-            ctx.arc(x, y, 7, 0, Math.PI * 2);
-            ctx.fill();
-            ctx.globalAlpha = 1;
-            
-            return true;
-        });
-        
-        requestAnimationFrame(draw);
-    }
-    
-    draw();
     
     // Failover button handler
     document.getElementById('failover-btn').addEventListener('click', async () => {
@@ -1574,28 +1887,37 @@ HTML_CONTENT = """
     });
     
     // Export button handler
+    // Reused across exports; the previous object URL is released on the next click
+    const exportLink = document.createElement('a');
+    let exportUrl = null;
+    
     document.getElementById('export-btn').addEventListener('click', () => {
-        const exportData = {
-            timestamp: new Date().toISOString(),
-            stats: stats,
-            nodes: nodes.map(n => ({
+        const exportNodes = new Array(nodes.length);
+        for (let i = 0; i < nodes.length; i++) {
+            const n = nodes[i];
+            exportNodes[i] = {
                 id: n.id,
                 name: n.name,
                 protocol: n.protocol,
                 connected: n.connected,
                 battery: n.battery,
                 energy_j: n.energy_mj || 0
-            })),
+            };
+        }
+        
+        const exportData = {
+            timestamp: new Date().toISOString(),
+            stats: stats,
+            nodes: exportNodes,
             uptime_seconds: Math.floor((Date.now() - startTime) / 1000)
         };
         
+        if (exportUrl) URL.revokeObjectURL(exportUrl);
         const blob = new Blob([JSON.stringify(exportData, null, 2)], { type: 'application/json' });
-        const url = URL.createObjectURL(blob);
-        const a = document.createElement('a');
-        a.href = url;
-        a.download = `iot_simulation_metrics_${Date.now()}.json`;
-        a.click();
-        URL.revokeObjectURL(url);
+        exportUrl = URL.createObjectURL(blob);
+        exportLink.href = exportUrl;
+        exportLink.download = `iot_simulation_metrics_${Date.now()}.json`;
+        exportLink.click();
     });
 </script>
 </body>
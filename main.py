@@ -9,7 +9,9 @@ import sys
 from typing import List
 
 # Configuration
-from config.simulation_config import *
+from config.simulation_config import (
+    BROKER_PRIMARY, BROKER_FAILOVER, GUI_PORT, NUM_NODES, PERCENT_STATIONARY
+)
 from config.phy_profiles import get_profile
 
 # Simulation components
@@ -130,4 +132,12 @@ if __name__ == "__main__":
     print("=" * 60)
     print()
     
+    # uvloop has to be installed before the loop is created; the dashboard
+    # server runs on whatever loop asyncio.run() starts here
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     asyncio.run(main())
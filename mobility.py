@@ -5,10 +5,19 @@ Grid-based and random waypoint movement patterns
 
 import math
 import random
-from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass
+from array import array
+from collections import deque
+from typing import Deque, Dict, List, Tuple, Optional
+from dataclasses import dataclass, field
 from enum import Enum
 
+# adjacent grid cells for the grid model
+_DIRS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+# hot-path random draws: uniform(a, b) is a + (b - a) * _rand()
+_rand = random.random
+_TWO_PI = 2 * math.pi
+
 
 class MobilityModel(Enum):
     """Types of mobility models"""
@@ -18,7 +27,7 @@ class MobilityModel(Enum):
     RANDOM_DIRECTION = "random_direction"
 
 
-@dataclass
+@dataclass(slots=True)
 class Position:
     """2D position with coordinates"""
     x: float
@@ -26,12 +35,38 @@ class Position:
     
     def distance_to(self, other: 'Position') -> float:
         """Calculate Euclidean distance to another position"""
-        return math.sqrt((self.x - other.x) ** 2 + (self.y - other.y) ** 2)
+        return math.hypot(self.x - other.x, self.y - other.y)
     
     def __str__(self):
         return f"({self.x:.2f}, {self.y:.2f})"
 
 
+class _PositionSnapshot(Position):
+    """Read-only Position copied out of a MobilityState row
+    
+    Writing to it would not move the node, so writes raise instead.
+    """
+    __slots__ = ()
+    
+    def __init__(self, x: float, y: float):
+        object.__setattr__(self, 'x', x)
+        object.__setattr__(self, 'y', y)
+        
+    def __setattr__(self, name, value):
+        raise AttributeError(f"node positions are read-only copies; "
+                             f"use set_position() or assign .position instead of setting .{name}")
+    
+    def __eq__(self, other):
+        if isinstance(other, Position):
+            return self.x == other.x and self.y == other.y
+        return NotImplemented
+    
+    __hash__ = None
+    
+    def __reduce__(self):
+        return (type(self), (self.x, self.y))
+
+
 @dataclass
 class MovementConfig:
     """Configuration for mobility models"""
@@ -41,107 +76,240 @@ class MovementConfig:
     area_width: float = 1000.0  # meters
     area_height: float = 1000.0  # meters
     grid_cell_size: float = 100.0  # meters for grid model
+    max_grid_x: int = field(init=False, repr=False)
+    max_grid_y: int = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        # highest grid cell index along each axis
+        self.max_grid_x = math.floor(self.area_width / self.grid_cell_size) - 1
+        self.max_grid_y = math.floor(self.area_height / self.grid_cell_size) - 1
+
+
+class MobilityState:
+    """Struct-of-arrays motion state shared by a group of mobile nodes"""
+    
+    def __init__(self):
+        self.nodes: List['MobileNode'] = []
+        self.xs = array('d')
+        self.ys = array('d')
+        self.dest_xs = array('d')
+        self.dest_ys = array('d')
+        self.has_dest = bytearray()
+        self.speeds = array('d')
+        self.pauses = array('d')
+        self.traveled = array('d')
+        
+    def _columns(self):
+        return (self.nodes, self.xs, self.ys, self.dest_xs, self.dest_ys,
+                self.has_dest, self.speeds, self.pauses, self.traveled)
+        
+    def add(self, node: 'MobileNode', x: float, y: float, destination: Optional['Position'],
+            speed: float, pause: float, traveled: float) -> int:
+        """Append a row for node, return its index"""
+        self.nodes.append(node)
+        self.xs.append(x)
+        self.ys.append(y)
+        self.dest_xs.append(destination.x if destination else 0.0)
+        self.dest_ys.append(destination.y if destination else 0.0)
+        self.has_dest.append(destination is not None)
+        self.speeds.append(speed)
+        self.pauses.append(pause)
+        self.traveled.append(traveled)
+        return len(self.nodes) - 1
+        
+    def remove(self, index: int):
+        """Remove a row by moving the last row into its slot"""
+        last = len(self.nodes) - 1
+        for column in self._columns():
+            column[index] = column[last]
+            del column[last]
+        if index != last:
+            self.nodes[index]._index = index
+            
+    def advance(self, rows, current_time: float, time_delta: float) -> List[bool]:
+        """Advance the given rows one step, return whether each one moved"""
+        nodes = self.nodes
+        xs, ys = self.xs, self.ys
+        dest_xs, dest_ys = self.dest_xs, self.dest_ys
+        has_dest, speeds = self.has_dest, self.speeds
+        pauses, traveled = self.pauses, self.traveled
+        hypot = math.hypot
+        moved = []
+        
+        for i in rows:
+            node = nodes[i]
+            node.movement_history.append((current_time, Position(xs[i], ys[i])))
+            
+            if pauses[i] > 0:
+                pauses[i] -= time_delta
+                moved.append(False)  # no position change
+                continue
+                
+            if not has_dest[i]:
+                node._choose_new_destination()
+                moved.append(False)
+                continue
+                
+            # move toward destination
+            dx = dest_xs[i] - xs[i]
+            dy = dest_ys[i] - ys[i]
+            distance_to_dest = hypot(dx, dy)
+            movement_this_step = speeds[i] * time_delta
+            
+            if movement_this_step >= distance_to_dest:
+                # reached destination
+                xs[i] = dest_xs[i]
+                ys[i] = dest_ys[i]
+                traveled[i] += distance_to_dest
+                node._start_pause()
+            else:
+                # move partway toward destination
+                ratio = movement_this_step / distance_to_dest
+                xs[i] += dx * ratio
+                ys[i] += dy * ratio
+                traveled[i] += movement_this_step
+            moved.append(True)
+            
+        return moved
 
 
 class MobileNode:
-    """A node that can move according to mobility models"""
+    """A node that can move according to mobility models
+    
+    Motion state lives in a MobilityState row; the attributes below are
+    views onto it.
+    """
     
     def __init__(self, node_id: str, initial_position: Position, config: MovementConfig):
         self.node_id = node_id
-        self.position = initial_position
         self.config = config
-        self.destination: Optional[Position] = None
-        self.speed: float = 0.0
-        self.pause_time_remaining: float = 0.0
-        self.total_distance_traveled: float = 0.0
-        self.movement_history: List[Tuple[float, Position]] = []  # (timestamp, position)
+        # (timestamp, position), bounded to prevent memory issues
+        self.movement_history: Deque[Tuple[float, Position]] = deque(maxlen=1000)
+        self._state = MobilityState()
+        self._index = self._state.add(self, initial_position.x, initial_position.y, None, 0.0, 0.0, 0.0)
         
-    def update_position(self, current_time: float, time_delta: float) -> bool:
-        """Update node position based on mobility model"""
-        self.movement_history.append((current_time, Position(self.position.x, self.position.y)))
+    def _attach(self, state: MobilityState):
+        """Move this node's row into another MobilityState"""
+        old, i = self._state, self._index
+        self._index = state.add(self, old.xs[i], old.ys[i], self.destination,
+                                old.speeds[i], old.pauses[i], old.traveled[i])
+        self._state = state
+        old.remove(i)
         
-        # limit history size to prevent memory issues
-        if len(self.movement_history) > 1000:
-            self.movement_history.pop(0)
-            
-        if self.pause_time_remaining > 0:
-            self.pause_time_remaining -= time_delta
-            return False  # no position change
-            
-        if self.destination is None:
-            self._choose_new_destination()
-            return False
+    @property
+    def position(self) -> Position:
+        """Read-only copy of the current position"""
+        return _PositionSnapshot(self._state.xs[self._index], self._state.ys[self._index])
+    
+    @position.setter
+    def position(self, value: Position):
+        self.set_position(value.x, value.y)
+        
+    def set_position(self, x: float, y: float):
+        """Move the node in place"""
+        self._state.xs[self._index] = x
+        self._state.ys[self._index] = y
+        
+    @property
+    def x(self) -> float:
+        return self._state.xs[self._index]
+    
+    @x.setter
+    def x(self, value: float):
+        self._state.xs[self._index] = value
+        
+    @property
+    def y(self) -> float:
+        return self._state.ys[self._index]
+    
+    @y.setter
+    def y(self, value: float):
+        self._state.ys[self._index] = value
+        
+    @property
+    def destination(self) -> Optional[Position]:
+        """Read-only copy of the current destination, if any"""
+        state, i = self._state, self._index
+        return _PositionSnapshot(state.dest_xs[i], state.dest_ys[i]) if state.has_dest[i] else None
+    
+    @destination.setter
+    def destination(self, value: Optional[Position]):
+        state, i = self._state, self._index
+        state.has_dest[i] = value is not None
+        if value is not None:
+            state.dest_xs[i] = value.x
+            state.dest_ys[i] = value.y
             
-        # move toward destination
-        distance_to_dest = self.position.distance_to(self.destination)
-        movement_this_step = self.speed * time_delta
-        
-        if movement_this_step >= distance_to_dest:
-            # reached destination
-            self.position = self.destination
-            self.total_distance_traveled += distance_to_dest
-            self._start_pause()
-            return True
-        else:
-            # move partway toward destination
-            ratio = movement_this_step / distance_to_dest
-            new_x = self.position.x + (self.destination.x - self.position.x) * ratio
-            new_y = self.position.y + (self.destination.y - self.position.y) * ratio
-            self.position = Position(new_x, new_y)
-            self.total_distance_traveled += movement_this_step
-            return True
+    @property
+    def speed(self) -> float:
+        return self._state.speeds[self._index]
+    
+    @speed.setter
+    def speed(self, value: float):
+        self._state.speeds[self._index] = value
+        
+    @property
+    def pause_time_remaining(self) -> float:
+        return self._state.pauses[self._index]
+    
+    @pause_time_remaining.setter
+    def pause_time_remaining(self, value: float):
+        self._state.pauses[self._index] = value
+        
+    @property
+    def total_distance_traveled(self) -> float:
+        return self._state.traveled[self._index]
+        
+    def update_position(self, current_time: float, time_delta: float) -> bool:
+        """Update node position based on mobility model"""
+        return self._state.advance((self._index,), current_time, time_delta)[0]
             
     def _choose_new_destination(self):
         """Choose new destination based on mobility model"""
-        if self.config.model == MobilityModel.STATIC:
-            self.destination = None
-            self.speed = 0.0
-            
-        elif self.config.model == MobilityModel.GRID:
-            self._choose_grid_destination()
-            
-        elif self.config.model == MobilityModel.RANDOM_WAYPOINT:
-            self._choose_random_destination()
-            
-        elif self.config.model == MobilityModel.RANDOM_DIRECTION:
-            self._choose_random_direction()
+        chooser = _DESTINATION_CHOOSERS.get(self.config.model)
+        if chooser:
+            chooser(self)
             
+    def _stay_static(self):
+        """Static nodes never get a destination"""
+        self.destination = None
+        self.speed = 0.0
+        
     def _choose_grid_destination(self):
         """Choose destination in grid pattern"""
-        grid_x = math.floor(self.position.x / self.config.grid_cell_size)
-        grid_y = math.floor(self.position.y / self.config.grid_cell_size)
+        config = self.config
+        cell = config.grid_cell_size
+        position = self.position
+        grid_x = math.floor(position.x / cell)
+        grid_y = math.floor(position.y / cell)
         
         # move to adjacent grid cell
-        directions = [(1, 0), (-1, 0), (0, 1), (0, -1)]
-        dx, dy = random.choice(directions)
+        dx, dy = _DIRS[int(_rand() * 4)]
         
-        new_grid_x = max(0, min(grid_x + dx, math.floor(self.config.area_width / self.config.grid_cell_size) - 1))
-        new_grid_y = max(0, min(grid_y + dy, math.floor(self.config.area_height / self.config.grid_cell_size) - 1))
+        new_grid_x = max(0, min(grid_x + dx, config.max_grid_x))
+        new_grid_y = max(0, min(grid_y + dy, config.max_grid_y))
         
         # random position within the grid cell
-        dest_x = random.uniform(
-            new_grid_x * self.config.grid_cell_size,
-            (new_grid_x + 1) * self.config.grid_cell_size
-        )
-        dest_y = random.uniform(
-            new_grid_y * self.config.grid_cell_size,
-            (new_grid_y + 1) * self.config.grid_cell_size
-        )
+        dest_x = (new_grid_x + _rand()) * cell
+        dest_y = (new_grid_y + _rand()) * cell
         
         self.destination = Position(dest_x, dest_y)
-        self.speed = random.uniform(*self.config.speed_range)
+        speed_min, speed_max = config.speed_range
+        self.speed = speed_min + (speed_max - speed_min) * _rand()
         
     def _choose_random_destination(self):
         """Choose random destination within area"""
-        dest_x = random.uniform(0, self.config.area_width)
-        dest_y = random.uniform(0, self.config.area_height)
+        config = self.config
+        dest_x = config.area_width * _rand()
+        dest_y = config.area_height * _rand()
         self.destination = Position(dest_x, dest_y)
-        self.speed = random.uniform(*self.config.speed_range)
+        speed_min, speed_max = config.speed_range
+        self.speed = speed_min + (speed_max - speed_min) * _rand()
         
     def _choose_random_direction(self):
         """Choose random direction with current speed"""
-        angle = random.uniform(0, 2 * math.pi)
-        distance = random.uniform(50, 200)  # travel 50-200 meters in this direction
+        angle = _TWO_PI * _rand()
+        distance = 50 + 150 * _rand()  # travel 50-200 meters in this direction
         
         dest_x = self.position.x + math.cos(angle) * distance
         dest_y = self.position.y + math.sin(angle) * distance
@@ -151,12 +319,14 @@ class MobileNode:
         dest_y = max(0, min(dest_y, self.config.area_height))
         
         self.destination = Position(dest_x, dest_y)
-        self.speed = random.uniform(*self.config.speed_range)
+        speed_min, speed_max = self.config.speed_range
+        self.speed = speed_min + (speed_max - speed_min) * _rand()
         
     def _start_pause(self):
         """Start pause at destination"""
         self.destination = None
-        self.pause_time_remaining = random.uniform(*self.config.pause_range)
+        pause_min, pause_max = self.config.pause_range
+        self.pause_time_remaining = pause_min + (pause_max - pause_min) * _rand()
         
     def get_movement_stats(self) -> Dict:
         """Get movement statistics"""
@@ -171,6 +341,15 @@ class MobileNode:
         }
 
 
+# one dict lookup per destination change instead of walking an if-chain
+_DESTINATION_CHOOSERS = {
+    MobilityModel.STATIC: MobileNode._stay_static,
+    MobilityModel.GRID: MobileNode._choose_grid_destination,
+    MobilityModel.RANDOM_WAYPOINT: MobileNode._choose_random_destination,
+    MobilityModel.RANDOM_DIRECTION: MobileNode._choose_random_direction,
+}
+
+
 class MobilityManager:
     """Manages movement of all mobile nodes"""
     
@@ -178,6 +357,8 @@ class MobilityManager:
         self.area_width = area_width
         self.area_height = area_height
         self.nodes: Dict[str, MobileNode] = {}
+        self._state = MobilityState()
+        self._ids: Optional[Tuple[str, ...]] = None  # row order cache for positions_soa
         self.update_interval = 1.0  # seconds
         
     def add_node(self, node_id: str, initial_x: float, initial_y: float, 
@@ -192,21 +373,23 @@ class MobilityManager:
         
         position = Position(initial_x, initial_y)
         node = MobileNode(node_id, position, config)
+        node._attach(self._state)
         self.nodes[node_id] = node
+        self._ids = None
         return node
         
     def remove_node(self, node_id: str):
         """Remove a mobile node"""
         if node_id in self.nodes:
-            del self.nodes[node_id]
+            # detach so the removed node keeps working on its own
+            self.nodes.pop(node_id)._attach(MobilityState())
+            self._ids = None
             
     def update_all_positions(self, current_time: float, time_delta: float) -> Dict[str, bool]:
         """Update all node positions"""
-        updates = {}
-        for node_id, node in self.nodes.items():
-            updated = node.update_position(current_time, time_delta)
-            updates[node_id] = updated
-        return updates
+        state = self._state
+        moved = state.advance(range(len(state.nodes)), current_time, time_delta)
+        return {node.node_id: updated for node, updated in zip(state.nodes, moved)}
         
     def get_node_position(self, node_id: str) -> Optional[Position]:
         """Get current position of a node"""
@@ -214,15 +397,29 @@ class MobilityManager:
             return self.nodes[node_id].position
         return None
         
+    def positions_soa(self) -> Tuple[Tuple[str, ...], array, array]:
+        """Get (ids, xs, ys) for all nodes without building Position objects
+        
+        xs and ys are the live coordinate arrays, updated in place each step;
+        treat them as read-only.
+        """
+        state = self._state
+        if self._ids is None:
+            self._ids = tuple(node.node_id for node in state.nodes)
+        return self._ids, state.xs, state.ys
+        
     def get_all_positions(self) -> Dict[str, Position]:
-        """Get all node positions"""
-        return {node_id: node.position for node_id, node in self.nodes.items()}
+        """Get all node positions (prefer positions_soa for bulk reads)"""
+        state = self._state
+        return {node.node_id: Position(x, y) for node, x, y in zip(state.nodes, state.xs, state.ys)}
         
     def get_distance_between(self, node1_id: str, node2_id: str) -> Optional[float]:
         """Get distance between two nodes"""
-        pos1 = self.get_node_position(node1_id)
-        pos2 = self.get_node_position(node2_id)
+        node1 = self.nodes.get(node1_id)
+        node2 = self.nodes.get(node2_id)
         
-        if pos1 and pos2:
-            return pos1.distance_to(pos2)
+        if node1 and node2:
+            xs, ys = self._state.xs, self._state.ys
+            i, j = node1._index, node2._index
+            return math.hypot(xs[i] - xs[j], ys[i] - ys[j])
         return None
\ No newline at end of file
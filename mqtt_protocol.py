@@ -3,19 +3,27 @@ MQTT Protocol Implementation for IoT Simulation
 Implements QoS 0/1, DUP handling, retained messages, keep-alive, reconnect with exponential backoff
 """
 
+import asyncio
+import sys
 import time
 import random
 import logging
-from enum import Enum
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Set
-from queue import Queue, Empty
+from enum import Enum, IntEnum
+from dataclasses import dataclass, field
+from collections import Counter, defaultdict, deque
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from sim.topic_trie import TopicTrie, has_wildcards, topic_matches
 
 logger = logging.getLogger(__name__)
 
+# Packet ids recorded per duplicate-bitmap generation. A quarter of the
+# 16-bit id space, so an id is forgotten well before a sender's counter
+# comes back round to it
+_RECV_GENERATION = 16384
 
-class QoSLevel(Enum):
-    """MQTT Quality of Service levels"""
+
+class QoSLevel(IntEnum):
+    """MQTT Quality of Service levels (plain ints on the hot path)"""
     QOS_0 = 0  # At most once
     QOS_1 = 1  # At least once
 
@@ -33,24 +41,33 @@ class MessageType(Enum):
     DISCONNECT = "DISCONNECT"
 
 
-@dataclass
+@dataclass(slots=True)
 class MQTTMessage:
     """MQTT message structure"""
     msg_type: MessageType
     topic: str = ""
     payload: bytes = b""
-    qos: QoSLevel = QoSLevel.QOS_0
+    qos: int = 0  # QoSLevel value
     retain: bool = False
     dup: bool = False
     msg_id: int = 0
-    timestamp: float = 0.0
+    timestamp: float = 0.0  # set on first get_timestamp() if not given
+    topic_tokens: Tuple[str, ...] = field(default=(), repr=False, compare=False)  # topic levels
     
     def __post_init__(self):
+        if self.topic:
+            # Interned topics make the broker's dict lookups identity hits
+            self.topic = sys.intern(self.topic)
+            self.topic_tokens = tuple(self.topic.split('/'))
+            
+    def get_timestamp(self) -> float:
+        """Get the message timestamp, stamping it now if it was never set"""
         if self.timestamp == 0.0:
             self.timestamp = time.time()
+        return self.timestamp
 
 
-@dataclass
+@dataclass(slots=True)
 class MQTTConfig:
     """MQTT client configuration"""
     keep_alive_interval: int = 60  # seconds
@@ -59,93 +76,247 @@ class MQTTConfig:
     reconnect_max_delay: float = 60.0  # seconds
     max_reconnect_attempts: int = 10
     qos_default: QoSLevel = QoSLevel.QOS_0
+    receive_max: int = 1024  # QoS 1 in-flight window
+    backoff_table: Tuple[float, ...] = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        # Reconnect delay after each attempt, indexed by attempt count
+        self.backoff_table = tuple(
+            min(self.reconnect_min_delay * (2 ** i), self.reconnect_max_delay)
+            for i in range(self.max_reconnect_attempts + 1)
+        )
+
+
+class _Counters:
+    """Integer counters held in slots, cheaper to bump than dict entries"""
+    __slots__ = ()
+    
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+            
+    def as_dict(self) -> Dict[str, int]:
+        return {name: getattr(self, name) for name in self.__slots__}
+    
+    # Mapping-style access so callers written against the old stats dict keep working
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __setitem__(self, key: str, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+        
+    def __contains__(self, key) -> bool:
+        return key in self.__slots__
+    
+    def __iter__(self):
+        return iter(self.__slots__)
+    
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+    
+    def keys(self):
+        return self.__slots__
+    
+    def items(self):
+        return self.as_dict().items()
+
+
+class _BrokerStats(_Counters):
+    __slots__ = ('messages_received', 'messages_published', 'clients_connected',
+                 'clients_disconnected', 'subscriptions_total', 'queue_depth',
+                 'messages_per_topic')
+    
+    def __init__(self):
+        super().__init__()
+        self.messages_per_topic: Counter = Counter()
+
+
+class _ClientStats(_Counters):
+    __slots__ = ('messages_sent', 'messages_received', 'duplicates_received', 'reconnections',
+                 'publish_failures', 'qos1_messages', 'qos0_messages')
 
 
 class MQTTBroker:
     """MQTT Broker implementation"""
     
-    def __init__(self, broker_id: str):
+    def __init__(self, broker_id: str, batch_size: int = 1, batch_interval: float = 0.05):
         self.broker_id = broker_id
         self.clients: Dict[str, 'MQTTClient'] = {}
-        self.subscriptions: Dict[str, Set[str]] = {}  # topic -> set of client_ids
+        self.subscriptions = TopicTrie()  # topic filter -> set of client_ids
+        self._client_topics: Dict[str, Set[str]] = defaultdict(set)  # client_id -> topic filters
         self.retained_messages: Dict[str, MQTTMessage] = {}  # topic -> message
-        self.message_queue: Queue = Queue()
+        
+        # Per-topic delivery list of (client_id, receive_message) for connected
+        # subscribers. One filter can match many topics, so any subscription
+        # or client change drops the whole cache
+        self._fanout_cache: Dict[str, Tuple[Tuple[str, Callable[[MQTTMessage], bool]], ...]] = {}
+        
+        # Publish batching: with batch_size > 1, messages are held per
+        # (topic, publisher) and delivered together once batch_size is reached,
+        # batch_interval seconds have passed, or flush() is called
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self._pending_by_topic: Dict[Tuple[str, str], List[MQTTMessage]] = {}
+        self._batch_started = 0.0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
         
         # Statistics
-        self.stats = {
-            'messages_received': 0,
-            'messages_published': 0,
-            'clients_connected': 0,
-            'clients_disconnected': 0,
-            'subscriptions_total': 0,
-            'queue_depth': 0,
-            'messages_per_topic': {}
-        }
+        self._stats = _BrokerStats()
+        self._topic_counts: Counter = self._stats.messages_per_topic  # messages per topic
+        
+    @property
+    def stats(self) -> _BrokerStats:
+        """Live broker counters; supports both attribute and dict-style access"""
+        return self._stats
         
     def register_client(self, client: 'MQTTClient'):
         """Register a client with the broker"""
         self.clients[client.client_id] = client
-        self.stats['clients_connected'] += 1
+        self._fanout_cache.clear()
+        self._stats.clients_connected += 1
+        self._stats.queue_depth += len(client.message_queue)
         logger.info(f"Broker {self.broker_id}: Client {client.client_id} registered")
         
     def unregister_client(self, client_id: str):
         """Unregister a client"""
         if client_id in self.clients:
-            del self.clients[client_id]
-            self.stats['clients_disconnected'] += 1
+            client = self.clients.pop(client_id)
+            self._fanout_cache.clear()
+            self._stats.clients_disconnected += 1
+            self._stats.queue_depth -= len(client.message_queue)
             
             # Remove subscriptions
-            for topic in list(self.subscriptions.keys()):
-                if client_id in self.subscriptions[topic]:
-                    self.subscriptions[topic].remove(client_id)
-                    if not self.subscriptions[topic]:
-                        del self.subscriptions[topic]
+            for topic in self._client_topics.pop(client_id, ()):
+                if self.subscriptions.remove(topic, client_id):
+                    self._stats.subscriptions_total -= 1
                         
     def subscribe(self, client_id: str, topic: str):
         """Subscribe a client to a topic"""
-        if topic not in self.subscriptions:
-            self.subscriptions[topic] = set()
-        self.subscriptions[topic].add(client_id)
-        self.stats['subscriptions_total'] = sum(len(subs) for subs in self.subscriptions.values())
-        
-        # Send retained message if exists
-        if topic in self.retained_messages:
-            if client_id in self.clients:
-                self.clients[client_id].receive_message(self.retained_messages[topic])
+        topic = sys.intern(topic)
+        if self.subscriptions.add(topic, client_id):
+            self._client_topics[client_id].add(topic)
+            self._stats.subscriptions_total += 1
+            self._fanout_cache.clear()
+        
+        # Send retained message(s) if any match
+        client = self.clients.get(client_id)
+        if client:
+            if not has_wildcards(topic):
+                if topic in self.retained_messages:
+                    client.receive_message(self.retained_messages[topic])
+            else:
+                for retained_topic, retained in list(self.retained_messages.items()):
+                    if topic_matches(topic, retained_topic):
+                        client.receive_message(retained)
                 
         logger.debug(f"Broker {self.broker_id}: Client {client_id} subscribed to {topic}")
         
     def publish(self, message: MQTTMessage, publisher_id: str):
         """Publish a message to subscribers"""
-        self.stats['messages_received'] += 1
-        
-        # Track messages per topic
-        if message.topic not in self.stats['messages_per_topic']:
-            self.stats['messages_per_topic'][message.topic] = 0
-        self.stats['messages_per_topic'][message.topic] += 1
+        self._stats.messages_received += 1
         
         # Handle retained messages
         if message.retain:
             self.retained_messages[message.topic] = message
             
-        # Find subscribers
-        subscribers = self.subscriptions.get(message.topic, set())
-        
-        # Publish to all subscribers except the publisher
-        for client_id in subscribers:
-            if client_id != publisher_id and client_id in self.clients:
-                self.clients[client_id].receive_message(message)
-                self.stats['messages_published'] += 1
-                
-        # Update queue depth
-        self.stats['queue_depth'] = sum(
-            client.message_queue.qsize() for client in self.clients.values()
+        if self.batch_size > 1:
+            # Per-topic counts are taken once per batch when it's delivered
+            self._add_to_batch(message, publisher_id)
+            return
+            
+        self._topic_counts[message.topic] += 1
+        
+        fanout = self._fanout_cache.get(message.topic)
+        if fanout is None:
+            fanout = self._build_fanout(message)
+        
+        self._publish_to_queues(fanout, message, publisher_id)
+        
+    def _build_fanout(self, message: MQTTMessage):
+        """Resolve and cache the delivery list for a message's topic"""
+        clients = self.clients
+        fanout = tuple(
+            (client_id, clients[client_id].receive_message)
+            for client_id in self.subscriptions.match(message.topic, message.topic_tokens)
+            if client_id in clients
         )
+        self._fanout_cache[message.topic] = fanout
+        return fanout
+        
+    def _add_to_batch(self, message: MQTTMessage, publisher_id: str):
+        """Hold a message until its batch is delivered"""
+        now = time.monotonic()
+        if not self._pending_by_topic:
+            self._batch_started = now
+            self._arm_flush_timer()
+            
+        key = (message.topic, publisher_id)
+        batch = self._pending_by_topic.get(key)
+        if batch is None:
+            batch = self._pending_by_topic[key] = []
+        batch.append(message)
+        
+        if len(batch) >= self.batch_size:
+            del self._pending_by_topic[key]
+            self._flush_topic(message.topic, publisher_id, batch)
+        elif now - self._batch_started >= self.batch_interval:
+            self.flush()
+            
+    def _arm_flush_timer(self):
+        """Schedule flush() batch_interval from now so a lone batch is still delivered"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # no loop: the interval is checked on the next publish
+        self._flush_handle = loop.call_later(self.batch_interval, self.flush)
+            
+    def flush(self):
+        """Deliver all held batches (call before shutdown)"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending_by_topic = self._pending_by_topic, {}
+        for (topic, publisher_id), batch in pending.items():
+            self._flush_topic(topic, publisher_id, batch)
+            
+    def _flush_topic(self, topic: str, publisher_id: str, batch: List[MQTTMessage]):
+        """Deliver a batch of messages on one topic to each subscriber in one call"""
+        self._topic_counts[topic] += len(batch)
+        clients = self.clients
+        delivered = 0
+        for client_id in self.subscriptions.match(topic, batch[0].topic_tokens):
+            if client_id != publisher_id:
+                client = clients.get(client_id)
+                if client:
+                    delivered += len(batch)
+                    client.receive_batch(batch)
+        self._stats.messages_published += delivered
+            
+    def _publish_to_queues(self, fanout, message: MQTTMessage, publisher_id: str):
+        """Deliver a message to all subscribers except the publisher
+        
+        Client inboxes are unbounded deques, so every delivery is a plain
+        append. queue_depth is kept by the inboxes themselves as messages
+        go in and out rather than summed over all clients.
+        """
+        delivered = 0
+        for client_id, receive in fanout:
+            if client_id != publisher_id:
+                delivered += 1
+                receive(message)
+        self._stats.messages_published += delivered
         
     def get_stats(self) -> Dict:
         """Get broker statistics"""
         return {
-            **self.stats,
+            **self._stats.as_dict(),
             'active_clients': len(self.clients),
             'active_topics': len(self.subscriptions),
             'retained_messages': len(self.retained_messages)
@@ -165,13 +336,25 @@ class MQTTClient:
         self.last_ping_time = 0.0
         self.reconnect_attempts = 0
         self.reconnect_delay = self.config.reconnect_min_delay
-        self.last_reconnect_attempt = 0.0
+        self.last_reconnect_attempt = float('-inf')
         
         # Message handling
-        self.message_queue = Queue()
-        self.pending_acks: Dict[int, MQTTMessage] = {}  # msg_id -> message
+        # Inbox: broker and clients share one event loop, so a plain deque
+        # plus an event for async consumers replaces a locking Queue
+        self.message_queue: deque = deque()  # drained with get_message()
+        self._inbox_event = asyncio.Event()
+        # Unacknowledged QoS 1 messages, slot msg_id % receive_max
+        self._pending: List[Optional[MQTTMessage]] = [None] * self.config.receive_max
+        self._pending_count = 0
         self.next_msg_id = 1
-        self.received_msg_ids: Set[int] = set()  # For duplicate detection
+        # Duplicate detection: one bit per 16-bit packet id. The current
+        # bitmap is retired after _RECV_GENERATION new ids and the previous
+        # one is still checked, so ids seen just before a rotation are caught
+        self._recv_bitmap = bytearray(8192)
+        self._prev_recv_bitmap = bytearray(8192)
+        self._recv_count = 0
+        # PUBACKs are never queued, so one instance is reused for every ack
+        self._puback = MQTTMessage(msg_type=MessageType.PUBACK)
         
         # Subscriptions
         self.subscriptions: Set[str] = set()
@@ -180,15 +363,12 @@ class MQTTClient:
         self.session_messages: List[MQTTMessage] = []
         
         # Statistics
-        self.stats = {
-            'messages_sent': 0,
-            'messages_received': 0,
-            'duplicates_received': 0,
-            'reconnections': 0,
-            'publish_failures': 0,
-            'qos1_messages': 0,
-            'qos0_messages': 0
-        }
+        self._stats = _ClientStats()
+        
+    @property
+    def stats(self) -> _ClientStats:
+        """Live client counters; supports both attribute and dict-style access"""
+        return self._stats
         
     def connect(self, broker: MQTTBroker) -> bool:
         """Connect to MQTT broker"""
@@ -196,7 +376,7 @@ class MQTTClient:
             self.broker = broker
             broker.register_client(self)
             self.connected = True
-            self.last_ping_time = time.time()
+            self.last_ping_time = time.monotonic()
             self.reconnect_attempts = 0
             self.reconnect_delay = self.config.reconnect_min_delay
             
@@ -222,7 +402,7 @@ class MQTTClient:
         
     def reconnect(self) -> bool:
         """Attempt to reconnect with exponential backoff"""
-        current_time = time.time()
+        current_time = time.monotonic()
         
         # Check if enough time has passed since last attempt
         if current_time - self.last_reconnect_attempt < self.reconnect_delay:
@@ -236,13 +416,10 @@ class MQTTClient:
             return False
             
         # Exponential backoff
-        self.reconnect_delay = min(
-            self.reconnect_delay * 2,
-            self.config.reconnect_max_delay
-        )
+        self.reconnect_delay = self.config.backoff_table[self.reconnect_attempts]
         
         logger.info(f"Client {self.client_id} reconnect attempt {self.reconnect_attempts}")
-        self.stats['reconnections'] += 1
+        self._stats.reconnections += 1
         
         # Reconnect logic would go here (requires broker reference)
         return False
@@ -261,62 +438,119 @@ class MQTTClient:
         """Publish a message"""
         if not self.connected or not self.broker:
             logger.warning(f"Client {self.client_id} not connected, cannot publish")
-            self.stats['publish_failures'] += 1
+            self._stats.publish_failures += 1
             return False
             
         if qos is None:
             qos = self.config.qos_default
             
+        if qos == 1:
+            slot = self.next_msg_id % self.config.receive_max
+            if self._pending[slot] is not None:
+                # Never overwrite an unacknowledged message; the caller retries later
+                logger.warning(f"Client {self.client_id} in-flight window full, cannot publish")
+                self._stats.publish_failures += 1
+                return False
+                
         message = MQTTMessage(
             msg_type=MessageType.PUBLISH,
             topic=topic,
             payload=payload,
             qos=qos,
             retain=retain,
-            msg_id=self.next_msg_id if qos == QoSLevel.QOS_1 else 0
+            msg_id=self.next_msg_id if qos == 1 else 0
         )
         
-        if qos == QoSLevel.QOS_1:
-            self.pending_acks[self.next_msg_id] = message
-            self.next_msg_id += 1
-            self.stats['qos1_messages'] += 1
+        if qos == 1:
+            self._pending[slot] = message
+            self._pending_count += 1
+            self.next_msg_id = self.next_msg_id % 0xFFFF + 1  # ids run 1..65535
+            self._stats.qos1_messages += 1
         else:
-            self.stats['qos0_messages'] += 1
+            self._stats.qos0_messages += 1
             
         self.broker.publish(message, self.client_id)
-        self.stats['messages_sent'] += 1
+        self._stats.messages_sent += 1
         
         return True
         
-    def receive_message(self, message: MQTTMessage):
-        """Receive a message from broker"""
+    def receive_message(self, message: MQTTMessage) -> bool:
+        """Receive a message from broker, return False for dropped duplicates"""
         # Duplicate detection for QoS 1
-        if message.qos == QoSLevel.QOS_1:
-            if message.msg_id in self.received_msg_ids:
-                self.stats['duplicates_received'] += 1
+        if message.qos == 1:
+            byte, bit = divmod(message.msg_id & 0xFFFF, 8)
+            mask = 1 << bit
+            if (self._recv_bitmap[byte] | self._prev_recv_bitmap[byte]) & mask:
+                self._stats.duplicates_received += 1
                 logger.debug(f"Client {self.client_id} received duplicate message {message.msg_id}")
-                return
-            self.received_msg_ids.add(message.msg_id)
+                return False
+            self._recv_bitmap[byte] |= mask
+            self._recv_count += 1
+            if self._recv_count >= _RECV_GENERATION:
+                self._prev_recv_bitmap = self._recv_bitmap
+                self._recv_bitmap = bytearray(8192)
+                self._recv_count = 0
             
             # Send PUBACK
             if self.broker:
-                ack = MQTTMessage(
-                    msg_type=MessageType.PUBACK,
-                    msg_id=message.msg_id
-                )
+                self._puback.msg_id = message.msg_id
                 # In real implementation, would send ACK back through network
                 
-        self.message_queue.put(message)
-        self.stats['messages_received'] += 1
+        self.message_queue.append(message)
+        self._inbox_event.set()
+        self._stats.messages_received += 1
+        broker = self._counting_broker()
+        if broker:
+            broker._stats.queue_depth += 1
+        return True
+        
+    def receive_batch(self, messages: List[MQTTMessage]) -> int:
+        """Receive several messages from broker, return how many were queued"""
+        if any(message.qos == 1 for message in messages):
+            # QoS 1 needs per-message duplicate detection
+            return sum(self.receive_message(message) for message in messages)
+        self.message_queue.extend(messages)
+        self._inbox_event.set()
+        self._stats.messages_received += len(messages)
+        broker = self._counting_broker()
+        if broker:
+            broker._stats.queue_depth += len(messages)
+        return len(messages)
+        
+    def get_message(self) -> Optional[MQTTMessage]:
+        """Take the oldest received message, or None if the inbox is empty"""
+        if not self.message_queue:
+            return None
+        broker = self._counting_broker()
+        if broker:
+            broker._stats.queue_depth -= 1
+        return self.message_queue.popleft()
+        
+    def _counting_broker(self) -> Optional[MQTTBroker]:
+        """The broker whose queue_depth includes this inbox, if registered with one"""
+        broker = self.broker
+        if broker is not None and broker.clients.get(self.client_id) is self:
+            return broker
+        return None
+        
+    async def next_message(self) -> MQTTMessage:
+        """Wait for and take the oldest received message"""
+        while not self.message_queue:
+            self._inbox_event.clear()
+            await self._inbox_event.wait()
+        return self.get_message()
         
     def process_ack(self, msg_id: int):
         """Process acknowledgment for QoS 1 message"""
-        if msg_id in self.pending_acks:
-            del self.pending_acks[msg_id]
+        slot = msg_id % self.config.receive_max
+        message = self._pending[slot]
+        if message is not None and message.msg_id == msg_id:
+            self._pending[slot] = None
+            self._pending_count -= 1
             
     def send_ping(self):
         """Send keep-alive ping"""
-        current_time = time.time()
+        current_time = time.monotonic()
         if current_time - self.last_ping_time >= self.config.keep_alive_interval:
             self.last_ping_time = current_time
             # In real implementation, would send PINGREQ
@@ -327,7 +561,7 @@ class MQTTClient:
         if not self.connected:
             return False
             
-        current_time = time.time()
+        current_time = time.monotonic()
         timeout = self.config.keep_alive_interval * 1.5
         
         if current_time - self.last_ping_time > timeout:
@@ -340,9 +574,9 @@ class MQTTClient:
     def get_stats(self) -> Dict:
         """Get client statistics"""
         return {
-            **self.stats,
+            **self._stats.as_dict(),
             'connected': self.connected,
-            'pending_acks': len(self.pending_acks),
+            'pending_acks': self._pending_count,
             'subscriptions': len(self.subscriptions),
-            'queue_size': self.message_queue.qsize()
+            'queue_size': len(self.message_queue)
         }
@@ -4,9 +4,55 @@ BLE MAC layer implementation with connection scheduling
 
 import asyncio
 import random
+import time
+from collections import deque
 from typing import Dict, Optional
 from config.phy_profiles import BLE_PROFILE
 from utils.logging_utils import log_mac_event
+from utils.phy_utils import calculate_pdr
+
+
+class _TickerScheduler:
+    """Shared connection-event clock, one timer per interval for all BLEMACs
+    
+    Waiters wake together on the next tick instead of each scheduling its own
+    sleep; a ticker stops once a tick finds nobody waiting. Like a real
+    connection event, the next tick can be anywhere from 0 to one interval
+    away, so a wait is not a full interval sleep.
+    """
+    _tickers: Dict[int, '_TickerScheduler'] = {}
+    
+    def __init__(self, interval_ms: int):
+        self.interval_ms = interval_ms
+        self.loop = asyncio.get_running_loop()
+        self.event = asyncio.Event()
+        self.waiters = 0
+        self.task: Optional[asyncio.Task] = None  # keeps _run alive while ticking
+        
+    @classmethod
+    async def wait(cls, interval_ms: int):
+        """Wait for the next tick of the given interval (0 to interval_ms away)"""
+        ticker = cls._tickers.get(interval_ms)
+        if ticker is None or ticker.loop is not asyncio.get_running_loop():
+            ticker = cls._tickers[interval_ms] = cls(interval_ms)
+            ticker.task = asyncio.create_task(ticker._run())
+        ticker.waiters += 1
+        try:
+            await ticker.event.wait()
+        finally:
+            ticker.waiters -= 1
+            
+    async def _run(self):
+        try:
+            while True:
+                await asyncio.sleep(self.interval_ms / 1000.0)
+                if not self.waiters:
+                    break
+                self.event.set()
+                self.event.clear()
+        finally:
+            if self._tickers.get(self.interval_ms) is self:
+                del self._tickers[self.interval_ms]
 
 
 class BLEMAC:
@@ -19,8 +65,9 @@ class BLEMAC:
         # Connection parameters
         self.conn_interval_ms = self.profile['conn_interval_ms']
         self.supervision_timeout_ms = self.conn_interval_ms * 6  # 6 intervals
+        self.supervision_timeout_ns = self.supervision_timeout_ms * 1_000_000
         self.last_conn_event = 0
-        self.last_supervision_check = 0
+        self.last_supervision_check_ns = 0  # time.monotonic_ns()
         
         # State management
         self.state = 'STANDBY'  # STANDBY, ADVERTISING, SCANNING, CONNECTED
@@ -29,11 +76,22 @@ class BLEMAC:
         
         # Advertising
         self.advertising_interval_ms = self.profile['advertising_interval_ms']
-        self.last_advertisement = 0
+        self.advertising_interval_ns = self.advertising_interval_ms * 1_000_000
+        self.last_advertisement_ns = 0  # time.monotonic_ns()
+        
+        # Transmission time: packet_size * tx_us_per_byte + overhead
+        self.tx_us_per_byte = 8 * 1_000_000 / self.profile['data_rate_bps']
+        self.first_tx_overhead_us = self.profile['packet_overhead_us'] + self.profile['preamble_time_us']
+        self.retry_tx_overhead_us = self.profile['packet_overhead_us']
+        
+        # Per-instance RNG for loss draws, seeded from the global one so
+        # random.seed() still makes runs reproducible
+        self._rand = random.Random(random.getrandbits(64))
+        self._rand_random = self._rand.random
         
         # Queue
-        self.queue = []
         self.max_queue_size = 20
+        self.queue = deque(maxlen=self.max_queue_size)
         
         # Statistics
         self.stats = {
@@ -48,10 +106,9 @@ class BLEMAC:
         
     async def send_packet(self, packet: bytes, dest: str, distance: float = 0, max_range: float = 400) -> Dict:
         """Send packet during connection event with distance-based PDR"""
-        from utils.phy_utils import calculate_pdr
-        
         # Check queue
-        if len(self.queue) >= self.max_queue_size:
+        # (deque maxlen would silently drop the oldest entry instead)
+        if len(self.queue) == self.max_queue_size:
             self.stats['packets_dropped'] += 1
             return {'success': False, 'reason': 'queue_full'}
             
@@ -60,20 +117,28 @@ class BLEMAC:
         
         # Calculate PDR based on distance
         pdr = calculate_pdr(distance, max_range, 'ble')
+        packet_loss_prob = 1.0 - pdr
         
         # Wait for next connection event
         await self._wait_for_connection_event()
         
         # Transmission
         packet_size = len(packet)
-        tx_time_us = (packet_size * 8 * 1_000_000 / self.profile['data_rate_bps']) + \
-                     self.profile['packet_overhead_us'] + self.profile['preamble_time_us']
-        
-        # Simulate packet loss based on distance
-        packet_loss_prob = 1.0 - pdr
-        if random.random() < packet_loss_prob:
-            # Retry in next connection event
-            return await self._retry_packet(packet, dest, distance, max_range, 0)
+        tx_time_us = packet_size * self.tx_us_per_byte + self.first_tx_overhead_us
+        
+        # Simulate packet loss based on distance; retry in following
+        # connection events (each retry costs energy!)
+        rand = self._rand_random
+        retries = 0
+        while rand() < packet_loss_prob:
+            if retries >= 3:  # Max 3 retries for BLE
+                self.stats['packets_dropped'] += 1
+                return {'success': False, 'reason': 'max_retries', 'retries': retries}
+                
+            retries += 1
+            self.stats['packets_retried'] += 1
+            await self._wait_for_connection_event()
+            tx_time_us = packet_size * self.tx_us_per_byte + self.retry_tx_overhead_us
             
         self.stats['packets_sent'] += 1
         
@@ -81,59 +146,25 @@ class BLEMAC:
             'success': True,
             'tx_time_us': tx_time_us,
             'conn_interval_ms': self.conn_interval_ms,
-            'retries': 0,
+            'retries': retries,
             'pdr': pdr
         }
         
     async def _wait_for_connection_event(self):
-        """Wait for next connection event"""
+        """Wait for next connection event
+        
+        Connection events follow a clock shared by all BLEMACs with the same
+        interval, so the wait is up to one interval, not always a full one.
+        """
         # Sleep until next connection event
-        sleep_time = self.conn_interval_ms / 1000.0
         self.sleeping = True
         self.stats['sleep_cycles'] += 1
         
-        await asyncio.sleep(sleep_time)
+        await _TickerScheduler.wait(self.conn_interval_ms)
         
         self.sleeping = False
         self.stats['connection_events'] += 1
         
-    async def _retry_packet(self, packet: bytes, dest: str, distance: float, max_range: float, retry_count: int = 0) -> Dict:
-        """Retry packet in next connection event with distance-based PDR"""
-        from utils.phy_utils import calculate_pdr
-        
-        if retry_count >= 3:  # Max 3 retries for BLE
-            self.stats['packets_dropped'] += 1
-            return {'success': False, 'reason': 'max_retries', 'retries': retry_count}
-            
-        self.stats['packets_retried'] += 1
-        
-        # Wait for next connection event
-        await self._wait_for_connection_event()
-        
-        # Calculate PDR for retry
-        pdr = calculate_pdr(distance, max_range, 'ble')
-        packet_loss_prob = 1.0 - pdr
-        
-        # Calculate transmission time (each retry costs energy!)
-        packet_size = len(packet)
-        tx_time_us = (packet_size * 8 * 1_000_000 / self.profile['data_rate_bps']) + \
-                     self.profile['packet_overhead_us']
-        
-        # Try again with distance-based success probability
-        if random.random() < packet_loss_prob:
-            return await self._retry_packet(packet, dest, distance, max_range, retry_count + 1)
-            
-        # Success
-        self.stats['packets_sent'] += 1
-        
-        return {
-            'success': True,
-            'tx_time_us': tx_time_us,
-            'conn_interval_ms': self.conn_interval_ms,
-            'retries': retry_count + 1,
-            'pdr': pdr
-        }
-        
     def set_connection_interval(self, interval_ms: int):
         """Set BLE connection interval"""
         self.conn_interval_ms = interval_ms
@@ -153,11 +184,10 @@ class BLEMAC:
         
     async def advertise(self):
         """Send advertisement packet"""
-        import time
-        current_time = time.time() * 1000
+        now = time.monotonic_ns()
         
-        if current_time - self.last_advertisement >= self.advertising_interval_ms:
-            self.last_advertisement = current_time
+        if now - self.last_advertisement_ns >= self.advertising_interval_ns:
+            self.last_advertisement_ns = now
             self.stats['advertisements_sent'] += 1
             # Simulate advertisement transmission
             await asyncio.sleep(0.001)
@@ -171,16 +201,15 @@ class BLEMAC:
         """Establish BLE connection"""
         self.state = 'CONNECTED'
         self.connected_peer = peer_address
-        self.last_supervision_check = 0
+        self.last_supervision_check_ns = 0
         log_mac_event(self.node_id, f"Connected to {peer_address}")
         
     def check_supervision_timeout(self) -> bool:
         """Check if supervision timeout occurred"""
-        import time
-        current_time = time.time() * 1000
+        now = time.monotonic_ns()
         
         if self.state == 'CONNECTED':
-            if current_time - self.last_supervision_check > self.supervision_timeout_ms:
+            if now - self.last_supervision_check_ns > self.supervision_timeout_ns:
                 self.stats['supervision_timeouts'] += 1
                 self.state = 'STANDBY'
                 self.connected_peer = None
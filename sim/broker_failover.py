@@ -3,21 +3,36 @@ Broker monitoring and failover orchestration
 """
 
 import asyncio
+import logging
+import math
+import random
 import time
-from typing import List, Optional
+from collections import defaultdict
+from typing import Dict, List, Optional
 from utils.logging_utils import log_failover_event, log_mqtt_event
+from utils.phy_utils import calculate_pdr_cached
+
+logger = logging.getLogger(__name__)
+
+
+def _d2(x1: float, y1: float, x2: float, y2: float) -> float:
+    """Squared distance between two points"""
+    dx = x1 - x2
+    dy = y1 - y2
+    return dx * dx + dy * dy
 
 
 class BrokerFailoverManager:
     """Manages broker health monitoring and failover"""
     
-    def __init__(self, primary_broker: str, failover_broker: str):
+    def __init__(self, primary_broker: str, failover_broker: str, seed: Optional[int] = None):
         self.primary_broker = primary_broker
         self.failover_broker = failover_broker
         self.current_broker = primary_broker
         
         self.primary_alive = True
         self.failover_alive = True
+        self._primary_state_changed = asyncio.Event()  # wakes monitor_brokers
         
         # Broker positions (for relocation)
         # Both brokers at same location (failover is logical, not physical)
@@ -36,7 +51,16 @@ class BrokerFailoverManager:
         
         # Track reconnection wave
         self.reconnection_wave = []  # List of (node_id, reconnect_time)
-        self.failover_start_time = None
+        self.failover_start_time = None  # wall clock, for display
+        self._failover_t0 = 0.0  # event loop clock, for wave timings
+        
+        # Full-jitter reconnect backoff: uniform(0, min(cap, base * 2**attempt))
+        self.reconnect_base = 0.1  # seconds
+        self.reconnect_cap = 30.0  # seconds
+        self._reconnect_attempts: Dict[str, int] = {}  # node_id -> failed attempts
+        # Reconnect jitter RNG. Without an explicit seed it is seeded from the
+        # global one so random.seed() still makes runs reproducible
+        self._rng = random.Random(random.getrandbits(64) if seed is None else seed)
         
         self.stats = {
             'failovers': 0,
@@ -53,12 +77,17 @@ class BrokerFailoverManager:
         
     def register_node(self, node):
         """Register a node for failover management"""
+        if not hasattr(node, 'gateway_coverage'):
+            node.gateway_coverage = False
         self.nodes.append(node)
         
     async def monitor_brokers(self):
-        """Continuously monitor broker health"""
+        """Monitor broker health, checking whenever the primary's state changes"""
         while True:
-            await asyncio.sleep(2.0)  # Check every 2 seconds
+            # Simulated brokers only change state when told to, so wait for
+            # that instead of polling
+            await self._primary_state_changed.wait()
+            self._primary_state_changed.clear()
             
             # Ping primary broker
             primary_ok = await self._ping_broker(self.primary_broker)
@@ -97,6 +126,7 @@ class BrokerFailoverManager:
         self.failover_in_progress = True
         self.stats['failovers'] += 1
         self.failover_start_time = time.time()
+        self._failover_t0 = asyncio.get_running_loop().time()
         self.reconnection_wave = []
         
         log_failover_event("=" * 60)
@@ -107,25 +137,22 @@ class BrokerFailoverManager:
         
         # Step 1: Nodes detect outage through missed PINGRESP/ACKs
         log_failover_event("Phase 1: Nodes detecting broker outage...")
-        disconnected_count = 0
-        inflight_preserved = 0
-        retained_preserved = 0
+        connected_nodes = [node for node in self.nodes if node.mqtt_client.connected]
+        disconnected_count = len(connected_nodes)
         
-        for node in self.nodes:
-            if node.mqtt_client.connected:
-                # Preserve inflight messages (QoS 1)
-                inflight_count = len(node.mqtt_client.inflight_messages)
-                inflight_preserved += inflight_count
-                
-                # Preserve retained messages
-                retained_count = len(node.mqtt_client.retained_messages)
-                retained_preserved += retained_count
-                
-                # Mark as disconnected (simulates missed PINGRESP)
-                node.mqtt_client.connected = False
-                disconnected_count += 1
-                
-                log_mqtt_event(node.node_id, f"Detected broker outage (inflight: {inflight_count}, retained: {retained_count})")
+        # Preserve inflight (QoS 1) and retained messages
+        inflight_preserved = sum(len(node.mqtt_client.inflight_messages) for node in connected_nodes)
+        retained_preserved = sum(len(node.mqtt_client.retained_messages) for node in connected_nodes)
+        
+        # Mark as disconnected (simulates missed PINGRESP)
+        for node in connected_nodes:
+            node.mqtt_client.connected = False
+            
+        # Per-node detail only at DEBUG, the totals below cover the phase
+        if logger.isEnabledFor(logging.DEBUG):
+            for node in connected_nodes:
+                log_mqtt_event(node.node_id, f"Detected broker outage (inflight: {len(node.mqtt_client.inflight_messages)}, "
+                                             f"retained: {len(node.mqtt_client.retained_messages)})")
                 
         self.stats['nodes_disconnected'] = disconnected_count
         self.stats['inflight_messages_preserved'] = inflight_preserved
@@ -142,43 +169,22 @@ class BrokerFailoverManager:
         # Step 3: Nodes enter exponential backoff reconnect mode
         log_failover_event("Phase 3: Nodes reconnecting with exponential backoff...")
         
+        # Every node backs off and reconnects concurrently, so the wave takes
+        # about as long as the slowest node rather than the sum of all of them
+        results = await asyncio.gather(
+            *(self._reconnect_node(node) for node in self.nodes),
+            return_exceptions=True
+        )
         reconnected_count = 0
-        for i, node in enumerate(self.nodes):
-            # Simulate exponential backoff (staggered reconnections)
-            backoff_delay = min(2 ** (i % 4), 8) * 0.1  # 0.1s, 0.2s, 0.4s, 0.8s pattern
-            await asyncio.sleep(backoff_delay)
-            
-            # Update broker address
-            node.mqtt_client.broker_address = self.failover_broker
-            node.broker_address = self.failover_broker
-            
-            # Attempt reconnection
-            success = await node.mqtt_client.connect()
-            
-            if success:
-                reconnect_time = time.time() - self.failover_start_time
-                self.reconnection_wave.append((node.node_id, reconnect_time))
+        for node, result in zip(self.nodes, results):
+            if isinstance(result, Exception):
+                log_mqtt_event(node.node_id, f"Reconnect failed: {result}")
+            elif result:
                 reconnected_count += 1
-                
-                log_mqtt_event(node.node_id, f"Reconnected to failover broker (t={reconnect_time:.2f}s)")
-                
-                # Restore subscriptions
-                if node.role in ['subscriber', 'both']:
-                    if node.subscribe_to:
-                        for publisher_id in node.subscribe_to:
-                            await node.mqtt_client.subscribe(f"sensors/{publisher_id}/data", qos=node.qos)
-                    else:
-                        await node.mqtt_client.subscribe(f"sensors/+/data", qos=node.qos)
-                    
-                    log_mqtt_event(node.node_id, "Subscriptions restored")
-                
-                # Resend inflight messages (QoS 1 semantics)
-                if node.mqtt_client.inflight_messages:
-                    log_mqtt_event(node.node_id, f"Resending {len(node.mqtt_client.inflight_messages)} inflight messages")
-                    
+        
         self.stats['nodes_reconnected'] = reconnected_count
         
-        failover_time = time.time() - self.failover_start_time
+        failover_time = asyncio.get_running_loop().time() - self._failover_t0
         self.stats['reconnection_time'] = failover_time
         
         log_failover_event("=" * 60)
@@ -189,10 +195,51 @@ class BrokerFailoverManager:
         
         self.failover_in_progress = False
         
+    async def _reconnect_node(self, node) -> bool:
+        """Reconnect one node to the failover broker after a jittered backoff"""
+        # Full jitter: random delays keep nodes from retrying in lockstep
+        attempt = self._reconnect_attempts.get(node.node_id, 0)
+        backoff_delay = self._rng.random() * min(self.reconnect_cap, self.reconnect_base * (2 ** attempt))
+        self._reconnect_attempts[node.node_id] = attempt + 1
+        await asyncio.sleep(backoff_delay)
+        
+        # Update broker address
+        node.mqtt_client.broker_address = self.failover_broker
+        node.broker_address = self.failover_broker
+        
+        # Attempt reconnection
+        if not await node.mqtt_client.connect():
+            return False
+        self._reconnect_attempts[node.node_id] = 0
+            
+        reconnect_time = asyncio.get_running_loop().time() - self._failover_t0
+        self.reconnection_wave.append((node.node_id, reconnect_time))
+        
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            log_mqtt_event(node.node_id, f"Reconnected to failover broker (t={reconnect_time:.2f}s)")
+        
+        # Restore subscriptions
+        if node.role in ['subscriber', 'both']:
+            if node.subscribe_to:
+                for publisher_id in node.subscribe_to:
+                    await node.mqtt_client.subscribe(f"sensors/{publisher_id}/data", qos=node.qos)
+            else:
+                await node.mqtt_client.subscribe(f"sensors/+/data", qos=node.qos)
+            
+            if debug:
+                log_mqtt_event(node.node_id, "Subscriptions restored")
+        
+        # Resend inflight messages (QoS 1 semantics)
+        if debug and node.mqtt_client.inflight_messages:
+            log_mqtt_event(node.node_id, f"Resending {len(node.mqtt_client.inflight_messages)} inflight messages")
+        return True
+        
     async def manual_failover(self):
         """Manually trigger failover (for testing)"""
         log_failover_event("Manual failover triggered")
         self.primary_alive = False
+        self._primary_state_changed.set()
         await self.trigger_failover()
         
     async def relocate_broker(self, broker_address: str = None, offset_x: float = None, offset_y: float = None):
@@ -214,10 +261,8 @@ class BrokerFailoverManager:
         
         # Random offset if not specified (~50m in x and y)
         if offset_x is None:
-            import random
             offset_x = random.uniform(-50, 50)
         if offset_y is None:
-            import random
             offset_y = random.uniform(-50, 50)
             
         new_position = (old_position[0] + offset_x, old_position[1] + offset_y)
@@ -244,39 +289,51 @@ class BrokerFailoverManager:
         nodes_improved = 0
         nodes_degraded = 0
         
+        # Per-node detail only at DEBUG, the summary below covers the event
+        debug = logger.isEnabledFor(logging.DEBUG)
+        sqrt = math.sqrt
+        old_x, old_y = old_position
+        new_x, new_y = new_position
         for node in self.nodes:
             if node.mqtt_client.broker_address == broker_address:
-                # Calculate old and new distances
-                old_distance = self._calculate_distance(node.position, old_position)
-                new_distance = self._calculate_distance(node.position, new_position)
+                # Range checks use squared distances; the square root is
+                # only taken for nodes whose PDR or log line needs it
+                x, y = node.position
+                old_d2 = _d2(x, y, old_x, old_y)
+                new_d2 = _d2(x, y, new_x, new_y)
                 
                 max_range = node.phy_profile.get('range_meters', 100)
+                range2 = max_range * max_range
                 
                 # Check if node goes out of range
-                if new_distance > max_range and old_distance <= max_range:
+                if new_d2 > range2 and old_d2 <= range2:
                     nodes_disconnected += 1
                     nodes_affected += 1
                     
                     # Disconnect node
                     node.mqtt_client.connected = False
-                    log_mqtt_event(node.node_id, f"DISCONNECTED: Out of range ({new_distance:.1f}m > {max_range}m)")
+                    if debug:
+                        log_mqtt_event(node.node_id, f"DISCONNECTED: Out of range ({sqrt(new_d2):.1f}m > {max_range}m)")
                     
                     # Node will attempt reconnection in its main loop
                     
-                elif new_distance <= max_range:
+                elif new_d2 <= range2:
                     nodes_affected += 1
+                    old_distance = sqrt(old_d2)
+                    new_distance = sqrt(new_d2)
                     
                     # Calculate PDR change
-                    from utils.phy_utils import calculate_pdr
-                    old_pdr = calculate_pdr(old_distance, max_range, node.protocol)
-                    new_pdr = calculate_pdr(new_distance, max_range, node.protocol)
+                    old_pdr = calculate_pdr_cached(old_distance, max_range, node.protocol)
+                    new_pdr = calculate_pdr_cached(new_distance, max_range, node.protocol)
                     
                     if new_pdr > old_pdr:
                         nodes_improved += 1
-                        log_mqtt_event(node.node_id, f"Link IMPROVED: {old_distance:.1f}m→{new_distance:.1f}m, PDR: {old_pdr:.1%}→{new_pdr:.1%}")
+                        if debug:
+                            log_mqtt_event(node.node_id, f"Link IMPROVED: {old_distance:.1f}m→{new_distance:.1f}m, PDR: {old_pdr:.1%}→{new_pdr:.1%}")
                     elif new_pdr < old_pdr:
                         nodes_degraded += 1
-                        log_mqtt_event(node.node_id, f"Link DEGRADED: {old_distance:.1f}m→{new_distance:.1f}m, PDR: {old_pdr:.1%}→{new_pdr:.1%}")
+                        if debug:
+                            log_mqtt_event(node.node_id, f"Link DEGRADED: {old_distance:.1f}m→{new_distance:.1f}m, PDR: {old_pdr:.1%}→{new_pdr:.1%}")
                     
                     # Node will automatically use new distance in next transmission
                     
@@ -299,30 +356,51 @@ class BrokerFailoverManager:
         
     async def update_gateway_coverage(self):
         """Update coverage as gateways move"""
-        for gateway in self.gateways:
-            if gateway.is_mobile:
-                # Check which nodes are now in/out of coverage
-                for node in self.nodes:
-                    distance = self._calculate_distance(node.position, gateway.position)
-                    
-                    if distance <= self.gateway_coverage_radius:
-                        # Node is in coverage
-                        if not hasattr(node, 'gateway_coverage') or not node.gateway_coverage:
-                            node.gateway_coverage = True
-                            self.stats['coverage_changes'] += 1
+        mobile_gateways = [gateway for gateway in self.gateways if gateway.is_mobile]
+        if not mobile_gateways:
+            return
+            
+        # Bucket nodes into radius-sized cells so each gateway only measures
+        # the nodes in its own and the 8 neighbouring cells
+        debug = logger.isEnabledFor(logging.DEBUG)
+        radius = self.gateway_coverage_radius
+        radius2 = radius * radius
+        cell_size = radius if radius > 0 else 1.0  # a zero radius still needs a grid
+        entered = left = 0
+        cells = defaultdict(list)
+        for node in self.nodes:
+            x, y = node.position
+            cells[(int(x // cell_size), int(y // cell_size))].append(node)
+            
+        for gateway in mobile_gateways:
+            # Check which nodes are now in/out of coverage
+            gx, gy = gateway.position
+            cx, cy = int(gx // cell_size), int(gy // cell_size)
+            in_range = set()
+            for cell in ((cx + dx, cy + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)):
+                for node in cells.get(cell, ()):
+                    x, y = node.position
+                    if _d2(x, y, gx, gy) > radius2:
+                        continue
+                    in_range.add(node)
+                    if not node.gateway_coverage:
+                        node.gateway_coverage = True
+                        entered += 1
+                        if debug:
                             log_failover_event(f"Node {node.node_id} entered gateway coverage")
-                    else:
-                        # Node is out of coverage
-                        if hasattr(node, 'gateway_coverage') and node.gateway_coverage:
-                            node.gateway_coverage = False
-                            self.stats['coverage_changes'] += 1
-                            log_failover_event(f"Node {node.node_id} left gateway coverage")
                             
-    def _calculate_distance(self, pos1: tuple, pos2: tuple) -> float:
-        """Calculate Euclidean distance between two positions"""
-        import math
-        return math.sqrt((pos1[0] - pos2[0])**2 + (pos1[1] - pos2[1])**2)
-    
+            # Leaving needs no distances, only the flag set above
+            for node in self.nodes:
+                if node.gateway_coverage and node not in in_range:
+                    node.gateway_coverage = False
+                    left += 1
+                    if debug:
+                        log_failover_event(f"Node {node.node_id} left gateway coverage")
+            
+        if entered or left:
+            self.stats['coverage_changes'] += entered + left
+            log_failover_event(f"Gateway coverage: {entered} nodes entered, {left} left")
+            
     def get_stats(self) -> dict:
         """Get failover statistics"""
         return {
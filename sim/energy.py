@@ -5,6 +5,10 @@ Energy consumption model for IoT nodes
 import time
 from typing import Dict
 
+# Energy states, indexed by state code
+_STATES = ('idle', 'tx', 'rx', 'sleep')
+_STATE_CODES = {state: code for code, state in enumerate(_STATES)}
+
 
 class EnergyTracker:
     """Tracks energy consumption for a node"""
@@ -18,14 +22,41 @@ class EnergyTracker:
         # ACCELERATED 10x for simulation visibility (real: 2,160,000 mJ)
         self.battery_capacity_mj = 216_000.0  # millijoules (10x faster depletion for demo)
         
-        # Time tracking (microseconds)
-        self.tx_time_us = 0
-        self.rx_time_us = 0
-        self.sleep_time_us = 0
-        self.idle_time_us = 0
+        # Power draw (mW) and time spent (microseconds) per state code
+        self._power = tuple(float(phy_profile[f'{state}_power_mw']) for state in _STATES)
+        self._time_accumulators = [0, 0, 0, 0]
+        
+        # Per-packet costs are linear in size, so fold the constants once
+        overhead_us = phy_profile.get('packet_overhead_us', 0)
+        self._us_per_byte = 8.0 * 1_000_000 / phy_profile['data_rate_bps']
+        self._overhead_us = overhead_us
+        self._tx_mj_per_byte = 8.0 * phy_profile['tx_power_mw'] / phy_profile['data_rate_bps']
+        self._rx_mj_per_byte = 8.0 * phy_profile['rx_power_mw'] / phy_profile['data_rate_bps']
+        self._tx_overhead_mj = phy_profile['tx_power_mw'] * overhead_us * 1e-6
+        self._rx_overhead_mj = phy_profile['rx_power_mw'] * overhead_us * 1e-6
         
         self.last_update = time.time()
-        self.current_state = 'idle'  # idle, tx, rx, sleep
+        self._state_code = 0  # idle
+        
+    @property
+    def current_state(self) -> str:
+        return _STATES[self._state_code]
+        
+    @property
+    def idle_time_us(self) -> float:
+        return self._time_accumulators[0]
+        
+    @property
+    def tx_time_us(self) -> float:
+        return self._time_accumulators[1]
+        
+    @property
+    def rx_time_us(self) -> float:
+        return self._time_accumulators[2]
+        
+    @property
+    def sleep_time_us(self) -> float:
+        return self._time_accumulators[3]
         
     def set_state(self, state: str):
         """Change energy state"""
@@ -36,38 +67,24 @@ class EnergyTracker:
         # Only track energy if duration is reasonable (< 60 seconds)
         # This prevents huge energy drain from initial startup
         if duration_us < 60_000_000:  # Less than 60 seconds
-            if self.current_state == 'tx':
-                self.tx_time_us += duration_us
-                energy_mj = self.phy_profile['tx_power_mw'] * duration_us / 1_000_000.0
-            elif self.current_state == 'rx':
-                self.rx_time_us += duration_us
-                energy_mj = self.phy_profile['rx_power_mw'] * duration_us / 1_000_000.0
-            elif self.current_state == 'sleep':
-                self.sleep_time_us += duration_us
-                energy_mj = self.phy_profile['sleep_power_mw'] * duration_us / 1_000_000.0
-            else:  # idle
-                self.idle_time_us += duration_us
-                energy_mj = self.phy_profile['idle_power_mw'] * duration_us / 1_000_000.0
-                
-            self.total_energy_mj += energy_mj
+            code = self._state_code
+            self._time_accumulators[code] += duration_us
+            self.total_energy_mj += self._power[code] * duration_us * 1e-6
             
             # Update battery level
             self._update_battery_level()
         
-        # Update state
-        self.current_state = state
+        # Update state (unknown states count as idle)
+        self._state_code = _STATE_CODES.get(state, 0)
         self.last_update = now
         
     def add_tx_energy(self, packet_size_bytes: int) -> float:
         """Add energy for transmission"""
-        tx_time_us = (packet_size_bytes * 8 * 1_000_000 / self.phy_profile['data_rate_bps']) + \
-                     self.phy_profile.get('packet_overhead_us', 0)
-        
         # Energy in millijoules
-        energy_mj = self.phy_profile['tx_power_mw'] * tx_time_us / 1_000_000.0
+        energy_mj = packet_size_bytes * self._tx_mj_per_byte + self._tx_overhead_mj
         
         self.total_energy_mj += energy_mj
-        self.tx_time_us += tx_time_us
+        self._time_accumulators[1] += packet_size_bytes * self._us_per_byte + self._overhead_us
         
         # Update battery level
         self._update_battery_level()
@@ -76,14 +93,11 @@ class EnergyTracker:
         
     def add_rx_energy(self, packet_size_bytes: int) -> float:
         """Add energy for reception"""
-        rx_time_us = (packet_size_bytes * 8 * 1_000_000 / self.phy_profile['data_rate_bps']) + \
-                     self.phy_profile.get('packet_overhead_us', 0)
-        
         # Energy in millijoules
-        energy_mj = self.phy_profile['rx_power_mw'] * rx_time_us / 1_000_000.0
+        energy_mj = packet_size_bytes * self._rx_mj_per_byte + self._rx_overhead_mj
         
         self.total_energy_mj += energy_mj
-        self.rx_time_us += rx_time_us
+        self._time_accumulators[2] += packet_size_bytes * self._us_per_byte + self._overhead_us
         
         # Update battery level
         self._update_battery_level()
@@ -97,7 +111,7 @@ class EnergyTracker:
         
     def get_stats(self) -> Dict:
         """Get energy statistics"""
-        total_time_us = self.tx_time_us + self.rx_time_us + self.sleep_time_us + self.idle_time_us
+        total_time_us = sum(self._time_accumulators)
         
         if total_time_us > 0:
             duty_cycle = ((self.tx_time_us + self.rx_time_us) / total_time_us) * 100
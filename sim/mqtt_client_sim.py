@@ -68,6 +68,7 @@ class MQTTClientSim:
         self.on_message_callback: Optional[Callable] = None
         self.on_connect_callback: Optional[Callable] = None
         self.on_disconnect_callback: Optional[Callable] = None
+        self.on_publish_callback: Optional[Callable] = None  # sync: (topic, payload, qos)
         
     async def connect(self, lwt_topic: str = None, lwt_message: bytes = None) -> bool:
         """Connect to MQTT broker with optional LWT"""
@@ -199,6 +200,9 @@ class MQTTClientSim:
             
         self.stats['messages_sent'] += 1
         
+        if self.on_publish_callback:
+            self.on_publish_callback(topic, payload, qos)
+        
         # Simulate network delay + WAN latency
         total_delay = 0.001 + (self.wan_latency_ms / 1000.0)
         await asyncio.sleep(total_delay)
@@ -0,0 +1,165 @@
+"""
+Topic subscription index with MQTT wildcard support
+Wildcard-free filters are plain dict hits; '+' and '#' filters live in a trie
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional, Sequence, Set
+
+
+def has_wildcards(topic_filter: str) -> bool:
+    """Check if a topic filter uses '+' or '#'"""
+    return '+' in topic_filter or '#' in topic_filter
+
+
+def topic_matches(topic_filter: str, topic: str) -> bool:
+    """Check a single topic against a topic filter"""
+    filter_levels = topic_filter.split('/')
+    topic_levels = topic.split('/')
+    
+    for i, level in enumerate(filter_levels):
+        if level == '#':
+            return True
+        if i >= len(topic_levels):
+            return False
+        if level != '+' and level != topic_levels[i]:
+            return False
+    return len(filter_levels) == len(topic_levels)
+
+
+@dataclass
+class TrieNode:
+    """One topic level of the wildcard trie"""
+    children: Dict[str, 'TrieNode'] = field(default_factory=dict)
+    plus: Optional['TrieNode'] = None
+    hash_subs: Set[str] = field(default_factory=set)  # '<this level>/#' subscribers
+    subs: Set[str] = field(default_factory=set)  # filter ends at this level
+    
+    def is_empty(self) -> bool:
+        return not (self.children or self.plus or self.hash_subs or self.subs)
+
+
+class TopicTrie:
+    """Maps topic filters to subscriber ids"""
+    
+    def __init__(self):
+        self.exact: Dict[str, Set[str]] = {}  # wildcard-free filter -> client_ids
+        self.wildcard: Dict[str, Set[str]] = {}  # wildcard filter -> client_ids
+        self.root = TrieNode()
+    
+    def __len__(self) -> int:
+        """Number of distinct topic filters"""
+        return len(self.exact) + len(self.wildcard)
+    
+    def filters(self) -> Iterator[str]:
+        """Iterate over all topic filters"""
+        yield from self.exact
+        yield from self.wildcard
+    
+    def subscribers(self, topic_filter: str) -> Set[str]:
+        """Get subscribers of one topic filter (not a match)"""
+        subs = self.exact.get(topic_filter)
+        if subs is None:
+            subs = self.wildcard.get(topic_filter, set())
+        return subs
+    
+    def add(self, topic_filter: str, client_id: str) -> bool:
+        """Add a subscription, return False if it already existed"""
+        if not has_wildcards(topic_filter):
+            subs = self.exact.setdefault(topic_filter, set())
+            if client_id in subs:
+                return False
+            subs.add(client_id)
+            return True
+        
+        subs = self.wildcard.setdefault(topic_filter, set())
+        if client_id in subs:
+            return False
+        subs.add(client_id)
+        
+        node = self.root
+        levels = topic_filter.split('/')
+        for level in levels:
+            if level == '#':
+                node.hash_subs.add(client_id)
+                return True
+            if level == '+':
+                if node.plus is None:
+                    node.plus = TrieNode()
+                node = node.plus
+            else:
+                child = node.children.get(level)
+                if child is None:
+                    child = node.children[level] = TrieNode()
+                node = child
+        node.subs.add(client_id)
+        return True
+    
+    def remove(self, topic_filter: str, client_id: str) -> bool:
+        """Remove a subscription, return False if it didn't exist"""
+        if not has_wildcards(topic_filter):
+            subs = self.exact.get(topic_filter)
+            if not subs or client_id not in subs:
+                return False
+            subs.discard(client_id)
+            if not subs:
+                del self.exact[topic_filter]
+            return True
+        
+        subs = self.wildcard.get(topic_filter)
+        if not subs or client_id not in subs:
+            return False
+        subs.discard(client_id)
+        if not subs:
+            del self.wildcard[topic_filter]
+        
+        # Descend, remembering the path so emptied nodes can be pruned
+        path = []
+        node = self.root
+        for level in topic_filter.split('/'):
+            if level == '#':
+                node.hash_subs.discard(client_id)
+                break
+            parent = node
+            node = parent.plus if level == '+' else parent.children[level]
+            path.append((parent, level, node))
+        else:
+            node.subs.discard(client_id)
+        
+        for parent, level, node in reversed(path):
+            if not node.is_empty():
+                break
+            if level == '+':
+                parent.plus = None
+            else:
+                del parent.children[level]
+        return True
+    
+    def match(self, topic: str, levels: Optional[Sequence[str]] = None) -> Set[str]:
+        """Get all subscribers whose filter matches a published topic
+        
+        levels is the topic already split on '/', if the caller has it.
+        The returned set may be shared with the index; don't modify it.
+        """
+        subs = self.exact.get(topic)
+        if not self.wildcard:
+            return subs if subs is not None else set()
+        
+        matched = set(subs) if subs else set()
+        if not levels:
+            levels = topic.split('/')
+        depth = len(levels)
+        pending = [(self.root, 0)]
+        while pending:
+            node, i = pending.pop()
+            if node.hash_subs:
+                matched |= node.hash_subs
+            if i == depth:
+                matched |= node.subs
+                continue
+            child = node.children.get(levels[i])
+            if child is not None:
+                pending.append((child, i + 1))
+            if node.plus is not None:
+                pending.append((node.plus, i + 1))
+        return matched
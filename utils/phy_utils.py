@@ -3,6 +3,7 @@ Physical layer utility functions for distance-based calculations
 """
 
 import math
+from functools import lru_cache
 
 
 def calculate_pdr(distance: float, max_range: float, protocol: str = 'wifi') -> float:
@@ -45,6 +46,21 @@ def calculate_pdr(distance: float, max_range: float, protocol: str = 'wifi') ->
     return max(0.1, min(1.0, pdr))
 
 
+@lru_cache(maxsize=4096)
+def _pdr_at_decimeters(distance_dm: int, max_range: float, protocol: str) -> float:
+    return calculate_pdr(distance_dm / 10, max_range, protocol)
+
+
+def calculate_pdr_cached(distance: float, max_range: float, protocol: str = 'wifi') -> float:
+    """
+    calculate_pdr with distance rounded to 0.1m and results memoized
+    
+    For bulk callers (e.g. re-evaluating every node after a topology change)
+    where many nodes share the same range and protocol.
+    """
+    return _pdr_at_decimeters(round(distance * 10), max_range, protocol)
+
+
 def calculate_retry_probability(distance: float, max_range: float, protocol: str = 'wifi') -> float:
     """
     Calculate probability that a packet will need retry based on distance